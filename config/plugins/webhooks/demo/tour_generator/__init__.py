@@ -1,10 +1,9 @@
 import logging
 import os
+import shutil
 
 from webob.compat import cgi_FieldStorage
 
-from galaxy.util import Params
-
 log = logging.getLogger(__name__)
 
 
@@ -73,7 +72,6 @@ class TourGenerator:
                 filename = os.path.basename(input_path)
 
                 with open(input_path, "rb") as f:
-                    content = f.read()
                     headers = {
                         "content-disposition": 'form-data; name="{}"; filename="{}"'.format(
                             "files_0|file_data", filename
@@ -82,7 +80,8 @@ class TourGenerator:
 
                     input_file = cgi_FieldStorage(headers=headers)
                     input_file.file = input_file.make_file()
-                    input_file.file.write(content)
+                    shutil.copyfileobj(f, input_file.file, 64 * 1024)
+                    input_file.file.seek(0)
 
                     inputs = {
                         "dbkey": "?",  # is it always a question mark?
@@ -93,9 +92,7 @@ class TourGenerator:
                         "files_0|file_data": input_file,
                     }
 
-                    params = Params(inputs, sanitize=False)
-                    incoming = params.__dict__
-                    output = upload_tool.handle_input(self._trans, incoming, history=None)
+                    output = upload_tool.handle_input(self._trans, inputs, history=None)
 
                     job_errors = output.get("job_errors", [])
                     if job_errors:
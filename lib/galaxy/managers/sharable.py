@@ -266,7 +266,8 @@ class SharableModelManager(
 
         needs_adding = new_users_shared_with - currently_shared_with
         for user in needs_adding:
-            current_shares.append(self.share_with(item, user, flush=False))
+            # users in needs_adding have no share yet, skip share_with's per-user lookup
+            current_shares.append(self._create_user_share_assoc(item, user, flush=False))
 
         needs_removing = currently_shared_with - new_users_shared_with
         for user in needs_removing:
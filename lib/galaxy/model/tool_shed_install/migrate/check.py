@@ -1,6 +1,7 @@
+import io
 import logging
 import os.path
-import sys
+from contextlib import redirect_stdout
 
 from migrate.versioning import (
     repository,
@@ -8,10 +9,8 @@ from migrate.versioning import (
 )
 from sqlalchemy import (
     create_engine,
-    MetaData,
-    Table,
+    inspect,
 )
-from sqlalchemy.exc import NoSuchTableError
 
 from galaxy.model.database_utils import (
     create_database,
@@ -47,15 +46,13 @@ def create_or_verify_database(url, engine_options=None, app=None):
         # Apply all scripts to get to current version
         migrate_to_current_version(engine, db_schema)
 
-    meta = MetaData(bind=engine)
     if app and getattr(app.config, "database_auto_migrate", False):
         migrate()
         return
 
-    # Try to load tool_shed_repository table
-    try:
-        Table("tool_shed_repository", meta, autoload=True)
-    except NoSuchTableError:
+    # Only table existence matters here, so list the table names once instead of reflecting them
+    table_names = set(inspect(engine).get_table_names())
+    if "tool_shed_repository" not in table_names:
         # No table means a completely uninitialized database.  If we
         # have an app, we'll set its new_installation setting to True
         # so the tool migration process will be skipped.
@@ -68,15 +65,12 @@ def create_or_verify_database(url, engine_options=None, app=None):
         migrate()
         return
 
-    try:
-        Table("migrate_version", meta, autoload=True)
-    except NoSuchTableError:
+    if "migrate_version" not in table_names:
         # The database exists but is not yet under migrate version control, so init with version 1
         log.info("Adding version control to existing database")
-        try:
-            Table("metadata_file", meta, autoload=True)
+        if "metadata_file" in table_names:
             schema.ControlledSchema.create(engine, migrate_repository, version=2)
-        except NoSuchTableError:
+        else:
             schema.ControlledSchema.create(engine, migrate_repository, version=1)
 
     # Verify that the code and the DB are in sync
@@ -99,22 +93,11 @@ def migrate_to_current_version(engine, schema):
     for ver, change in changeset:
         nextver = ver + changeset.step
         log.info(f"Migrating {ver} -> {nextver}... ")
-        old_stdout = sys.stdout
-
-        class FakeStdout:
-            def __init__(self):
-                self.buffer = []
-
-            def write(self, s):
-                self.buffer.append(s)
-
-            def flush(self):
-                pass
-
-        sys.stdout = FakeStdout()
+        buf = io.StringIO()
         try:
-            schema.runchange(ver, change, changeset.step)
+            with redirect_stdout(buf):
+                schema.runchange(ver, change, changeset.step)
         finally:
-            for message in "".join(sys.stdout.buffer).split("\n"):
-                log.info(message)
-            sys.stdout = old_stdout
+            output = buf.getvalue().strip("\n")
+            if output:
+                log.info("%s", output)
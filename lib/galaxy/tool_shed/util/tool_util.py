@@ -1,44 +1,91 @@
+import functools
 import logging
 import os
+import re
 import shutil
+import weakref
+from typing import (
+    Any,
+    Dict,
+)
 
-import galaxy.tools
 from galaxy import util
-from galaxy.datatypes.sniff import is_column_based
 from galaxy.tool_shed.util import basic_util
-from galaxy.util import checkers
-from galaxy.util.expressions import ExpressionContext
-from galaxy.web.form_builder import SelectField
 
 log = logging.getLogger(__name__)
 
+BINARY_PROBE_BYTES = 1024
+ZIP_MAGIC = b"PK\x03\x04"
+# Sample file extensions that are always (or never) copied to ~/tool-data, see is_data_index_sample_file.
+TEXTUAL_SAMPLE_EXTENSIONS = (".loc.sample", ".tab.sample", ".tsv.sample", ".txt.sample")
+BINARY_SAMPLE_EXTENSIONS = (
+    ".bam.sample",
+    ".bz2.sample",
+    ".gif.sample",
+    ".gz.sample",
+    ".jpeg.sample",
+    ".jpg.sample",
+    ".png.sample",
+    ".zip.sample",
+)
+FILENAMES_NOT_TO_COPY = frozenset(["tool_data_table_conf.xml.sample"])
+TOOL_SECTION_KEYS = frozenset(["id", "version", "name"])
+# Plain text replacements for the markup used in invalid tool messages.
+HTML_MARKUP_TEXT = {"<br/>": "\n", "<b>": "", "</b>": ""}
+MISSING_FILE_RE = re.compile(r"No such file or directory:\s*'([^']+)'")
+HTML_MARKUP_RE = re.compile("|".join(re.escape(markup) for markup in HTML_MARKUP_TEXT))
+
+# Select field options built per toolbox, see _get_toolbox_options.
+_toolbox_options_cache: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
 
 def build_shed_tool_conf_select_field(app):
     """Build a SelectField whose options are the keys in app.toolbox.shed_tool_confs."""
-    options = []
-    for dynamic_tool_conf_filename in app.toolbox.dynamic_conf_filenames():
-        if dynamic_tool_conf_filename.startswith("./"):
-            option_label = dynamic_tool_conf_filename.replace("./", "", 1)
-        else:
-            option_label = dynamic_tool_conf_filename
-        options.append((option_label, dynamic_tool_conf_filename))
+    from galaxy.web.form_builder import SelectField
+
     select_field = SelectField(name="shed_tool_conf")
-    for option_tup in options:
+    for option_tup in _get_toolbox_options(app.toolbox, "shed_tool_conf", _shed_tool_conf_options):
         select_field.add_option(option_tup[0], option_tup[1])
     return select_field
 
 
 def build_tool_panel_section_select_field(app):
     """Build a SelectField whose options are the sections of the current in-memory toolbox."""
-    options = []
-    for section_id, section_name in app.toolbox.get_sections():
-        options.append((section_name, section_id))
+    from galaxy.web.form_builder import SelectField
+
     select_field = SelectField(name="tool_panel_section_id", field_id="tool_panel_section_select")
-    for option_tup in options:
+    for option_tup in _get_toolbox_options(app.toolbox, "tool_panel_section", _tool_panel_section_options):
         select_field.add_option(option_tup[0], option_tup[1])
     return select_field
 
 
+def _get_toolbox_options(toolbox, name, build_options):
+    """
+    Return the (label, value) option tuples built by `build_options` for `toolbox`, reusing
+    the tuples built for the same toolbox until its reload count changes.
+    """
+    reload_count = getattr(toolbox, "_reload_count", None)
+    cached = _toolbox_options_cache.setdefault(toolbox, {})
+    if name not in cached or cached[name][0] != reload_count:
+        cached[name] = (reload_count, build_options(toolbox))
+    return cached[name][1]
+
+
+def _shed_tool_conf_options(toolbox):
+    options = []
+    for dynamic_tool_conf_filename in toolbox.dynamic_conf_filenames():
+        if dynamic_tool_conf_filename.startswith("./"):
+            option_label = dynamic_tool_conf_filename.replace("./", "", 1)
+        else:
+            option_label = dynamic_tool_conf_filename
+        options.append((option_label, dynamic_tool_conf_filename))
+    return options
+
+
+def _tool_panel_section_options(toolbox):
+    return [(section_name, section_id) for section_id, section_name in toolbox.get_sections()]
+
+
 def copy_sample_file(app, filename, dest_path=None):
     """
     Copies a sample file at `filename` to `the dest_path`
@@ -58,8 +105,14 @@ def copy_sample_file(app, filename, dest_path=None):
     # Only create the .loc file if it does not yet exist.  We don't overwrite it in case it
     # contains stuff proprietary to the local instance.
     non_sample_path = os.path.join(dest_path, copied_file)
-    if not os.path.lexists(non_sample_path):
-        shutil.copy(full_source_path, os.path.join(dest_path, copied_file))
+    try:
+        os.lstat(non_sample_path)
+    except FileNotFoundError:
+        # Copy from the .sample file just written next to it rather than re-reading the source.  A hard link
+        # would be cheaper, but the .sample copy is overwritten in place on reinstall, which would clobber the
+        # local .loc file too.
+        shutil.copyfile(full_destination_path, non_sample_path)
+        shutil.copymode(full_destination_path, non_sample_path)
     return non_sample_path
 
 
@@ -71,11 +124,10 @@ def copy_sample_files(app, sample_files, tool_path=None, sample_files_copied=Non
     appropriate files here because tool shed repositories can contain files ending in .sample
     that should not be copied to the ~/tool-data directory.
     """
-    filenames_not_to_copy = ["tool_data_table_conf.xml.sample"]
-    sample_files_copied = util.listify(sample_files_copied)
+    sample_files_copied = set(util.listify(sample_files_copied))
     for filename in sample_files:
-        filename_sans_path = os.path.split(filename)[1]
-        if filename_sans_path not in filenames_not_to_copy and filename not in sample_files_copied:
+        filename_sans_path = filename.rpartition(os.sep)[2]
+        if filename_sans_path not in FILENAMES_NOT_TO_COPY and filename not in sample_files_copied:
             if tool_path:
                 filename = os.path.join(tool_path, filename)
             # Attempt to ensure we're copying an appropriate file.
@@ -94,26 +146,27 @@ def generate_message_for_invalid_tools(
         new_line = "\n"
         bold_start = ""
         bold_end = ""
-    message = ""
+    message_parts = []
     if app.name == "galaxy":
         tip_rev = str(repository.changeset_revision)
     else:
         tip_rev = str(repository.tip())
     if not displaying_invalid_tool:
         if metadata_dict:
-            message += f"Metadata may have been defined for some items in revision '{tip_rev}'.  "
-            message += f"Correct the following problems if necessary and reset metadata.{new_line}"
+            message_parts.append(f"Metadata may have been defined for some items in revision '{tip_rev}'.  ")
+            message_parts.append(f"Correct the following problems if necessary and reset metadata.{new_line}")
         else:
-            message += f"Metadata cannot be defined for revision '{tip_rev}' so this revision cannot be automatically "
-            message += (
+            message_parts.append(
+                f"Metadata cannot be defined for revision '{tip_rev}' so this revision cannot be automatically "
+            )
+            message_parts.append(
                 f"installed into a local Galaxy instance.  Correct the following problems and reset metadata.{new_line}"
             )
     for itc_tup in invalid_file_tups:
         tool_file, exception_msg = itc_tup
-        if exception_msg.find("No such file or directory") >= 0:
-            exception_items = exception_msg.split()
-            missing_file_items = exception_items[7].split("/")
-            missing_file = missing_file_items[-1].rstrip("'")
+        missing_file_match = MISSING_FILE_RE.search(exception_msg)
+        if missing_file_match:
+            missing_file = missing_file_match.group(1).rsplit("/", 1)[-1]
             if missing_file.endswith(".loc"):
                 sample_ext = f"{missing_file}.sample"
             else:
@@ -128,11 +181,9 @@ def generate_message_for_invalid_tools(
             if as_html:
                 correction_msg = exception_msg
             else:
-                correction_msg = (
-                    exception_msg.replace("<br/>", new_line).replace("<b>", bold_start).replace("</b>", bold_end)
-                )
-        message += f"{bold_start}{tool_file}{bold_end} - {correction_msg}{new_line}"
-    return message
+                correction_msg = HTML_MARKUP_RE.sub(lambda match: HTML_MARKUP_TEXT[match.group(0)], exception_msg)
+        message_parts.append(f"{bold_start}{tool_file}{bold_end} - {correction_msg}{new_line}")
+    return "".join(message_parts)
 
 
 def get_tool_path_install_dir(partial_install_dir, shed_tool_conf_dict, tool_dict, config_elems):
@@ -158,22 +209,28 @@ def handle_missing_index_file(app, tool_path, sample_files, repository_tools_tup
     generated select lists that depend on a .loc file.  This method is not called
     from the tool shed, but from Galaxy when a repository is being installed.
     """
+    sample_files_copied_set = set(sample_files_copied)
+    # Map the name of each file a sample provides (e.g. xxx.loc) to the first sample file providing it.
+    sample_files_by_name: Dict[str, str] = {}
+    for sample_file in sample_files:
+        sample_file_name = basic_util.strip_path(sample_file)
+        if sample_file_name.endswith(".sample"):
+            sample_files_by_name.setdefault(sample_file_name[: -len(".sample")], sample_file)
     for repository_tools_tup in repository_tools_tups:
         tup_path, guid, repository_tool = repository_tools_tup
         params_with_missing_index_file = repository_tool.params_with_missing_index_file
         for param in params_with_missing_index_file:
             options = param.options
             missing_file_name = basic_util.strip_path(options.missing_index_file)
-            if missing_file_name not in sample_files_copied:
+            if missing_file_name not in sample_files_copied_set:
                 # The repository must contain the required xxx.loc.sample file.
-                for sample_file in sample_files:
-                    sample_file_name = basic_util.strip_path(sample_file)
-                    if sample_file_name == f"{missing_file_name}.sample":
-                        target_path = copy_sample_file(app, os.path.join(tool_path, sample_file))
-                        if options.tool_data_table and options.tool_data_table.missing_index_file:
-                            options.tool_data_table.handle_found_index_file(target_path)
-                        sample_files_copied.append(target_path)
-                        break
+                sample_file = sample_files_by_name.get(missing_file_name)
+                if sample_file is not None:
+                    target_path = copy_sample_file(app, os.path.join(tool_path, sample_file))
+                    if options.tool_data_table and options.tool_data_table.missing_index_file:
+                        options.tool_data_table.handle_found_index_file(target_path)
+                    sample_files_copied.append(target_path)
+                    sample_files_copied_set.add(target_path)
     return repository_tools_tups, sample_files_copied
 
 
@@ -182,6 +239,22 @@ def is_data_index_sample_file(file_path):
     Attempt to determine if a .sample file is appropriate for copying to ~/tool-data when
     a tool shed repository is being installed into a Galaxy instance.
     """
+    # Resolve the common, unambiguous extensions without touching the file.
+    lower_file_path = file_path.lower()
+    if lower_file_path.endswith(TEXTUAL_SAMPLE_EXTENSIONS):
+        return True
+    if lower_file_path.endswith(BINARY_SAMPLE_EXTENSIONS):
+        return False
+    stat = os.stat(file_path)
+    return _is_data_index_sample_file(file_path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_data_index_sample_file(file_path, mtime_ns, size):
+    from galaxy.datatypes.sniff import is_column_based
+    from galaxy.util import checkers
+
+    # The modification time and size are part of the cache key so that a changed file is re-examined.
     # Currently most data index files are tabular, so check that first.  We'll assume that
     # if the file is tabular, it's ok to copy.
     if is_column_based(file_path):
@@ -191,21 +264,28 @@ def is_data_index_sample_file(file_path):
         return False
     if checkers.check_image(file_path):
         return False
-    if checkers.check_binary(name=file_path):
-        return False
-    if checkers.is_bz2(file_path):
-        return False
-    if checkers.is_gzip(file_path):
-        return False
-    if checkers.is_zip(file_path):
-        return False
-    # Default to copying the file if none of the above are true.
-    return True
+    return not _is_binary_or_compressed(file_path, size)
+
+
+def _is_binary_or_compressed(file_path, size):
+    """
+    Combine checkers.check_binary with the bz2, gzip and zip checks using a single open of `file_path`.
+    """
+    with open(file_path, "rb") as fh:
+        header = fh.read(BINARY_PROBE_BYTES)
+        if util.is_binary(header) or header.startswith((util.gzip_magic, util.bz2_magic, ZIP_MAGIC)):
+            return True
+        # Some binary files have text only within the first bytes, so probe the middle of the file as well.
+        fh.seek(size // 2)
+        return util.is_binary(fh.read(BINARY_PROBE_BYTES))
 
 
 def new_state(trans, tool, invalid=False):
     """Create a new `DefaultToolState` for the received tool.  Only inputs on the first page will be initialized."""
-    state = galaxy.tools.DefaultToolState()
+    from galaxy.tools import DefaultToolState
+    from galaxy.util.expressions import ExpressionContext
+
+    state = DefaultToolState()
     state.inputs = {}
     if invalid:
         # We're attempting to display a tool in the tool shed that has been determined to have errors, so is invalid.
@@ -244,7 +324,4 @@ def panel_entry_per_tool(tool_section_dict):
         return False
     if len(tool_section_dict) != 3:
         return True
-    for k in tool_section_dict.keys():
-        if k not in ["id", "version", "name"]:
-            return True
-    return False
+    return not TOOL_SECTION_KEYS.issuperset(tool_section_dict)
@@ -13,15 +13,23 @@ import logging
 import os
 import os.path
 import re
+import shutil
 import string
+import sys
+import threading
 import time
-from glob import glob
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import NamedTemporaryFile
 from typing import List
 
 import refgenconf
 import requests
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 from galaxy import util
 from galaxy.exceptions import MessageException
 from galaxy.util import RW_R__R__
@@ -33,6 +41,16 @@ from galaxy.util.template import fill_template
 log = logging.getLogger(__name__)
 
 DEFAULT_TABLE_TYPE = "tabular"
+# Files below the tool data path that ToolDataPathFiles keeps track of
+LOC_FILE_EXTENSIONS = (".loc", ".loc.sample")
+# Number of loaded rows used to decide which columns are worth interning
+INTERN_SAMPLE_SIZE = 1024
+URL_CHUNK_SIZE = 64 * 1024
+# Maximum number of threads used to load the tables of a data table config file
+MAX_LOAD_WORKERS = 8
+
+# requests sessions used by URL backed data tables, one per thread since tables are loaded in parallel
+_url_sessions = threading.local()
 
 TOOL_DATA_TABLE_CONF_XML = """<?xml version="1.0"?>
 <tables>
@@ -40,39 +58,71 @@ TOOL_DATA_TABLE_CONF_XML = """<?xml version="1.0"?>
 """
 
 
+def get_url_session():
+    """
+    Return the requests session of the current thread, so that tables served from the same host reuse connections.
+    """
+    session = getattr(_url_sessions, "session", None)
+    if session is None:
+        session = _url_sessions.session = requests.Session()
+    return session
+
+
 class ToolDataPathFiles:
     def __init__(self, tool_data_path):
         self.tool_data_path = os.path.abspath(tool_data_path)
-        self.update_time = 0
+        self._tool_data_path_prefix = os.path.join(self.tool_data_path, "")
+        self._tool_data_path_files = None
+        self._update_lock = threading.Lock()
+        self.update_time = 0.0
 
     @property
     def tool_data_path_files(self):
-        if time.time() - self.update_time > 1:
-            self.update_files()
+        if self._tool_data_path_files is None or time.monotonic() - self.update_time > 1:
+            # Only one thread rescans at a time, the others keep using the previous result if there is one.
+            if self._update_lock.acquire(blocking=self._tool_data_path_files is None):
+                try:
+                    if self._tool_data_path_files is None or time.monotonic() - self.update_time > 1:
+                        self._update_files()
+                finally:
+                    self._update_lock.release()
         return self._tool_data_path_files
 
     def update_files(self):
+        with self._update_lock:
+            self._update_files()
+
+    def _update_files(self):
         try:
-            content = os.walk(self.tool_data_path)
-            self._tool_data_path_files = set(
-                filter(
-                    os.path.exists,
-                    [
-                        os.path.join(dirpath, fn)
-                        for dirpath, _, fn_list in content
-                        for fn in fn_list
-                        if fn and fn.endswith(".loc") or fn.endswith(".loc.sample")
-                    ],
-                )
-            )
-            self.update_time = time.time()
+            self._tool_data_path_files = frozenset(self._scan_loc_files(self.tool_data_path))
+            self.update_time = time.monotonic()
         except Exception:
-            log.exception()
-            self._tool_data_path_files = set()
+            log.exception("Failed to scan tool data path '%s' for location files", self.tool_data_path)
+            self._tool_data_path_files = frozenset()
+
+    def _scan_loc_files(self, path):
+        """
+        Recursively yield the paths of existing .loc and .loc.sample files below `path`.
+
+        Like os.walk, symlinked directories are not descended into, while symlinked files
+        are included if their target exists.
+        """
+        try:
+            entries = list(os.scandir(path))
+        except FileNotFoundError:
+            # The directory was removed while scanning
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from self._scan_loc_files(entry.path)
+            elif entry.name.endswith(LOC_FILE_EXTENSIONS) and entry.is_file():
+                yield entry.path
 
     def exists(self, path):
-        path = os.path.abspath(path)
-        if path in self.tool_data_path_files:
+        if not os.path.isabs(path):
+            path = os.path.abspath(path)
+        # Only paths below tool_data_path can be in the scanned set, anything else is checked on disk
+        if path.startswith(self._tool_data_path_prefix) and path in self.tool_data_path_files:
             return True
         else:
             return os.path.exists(path)
@@ -121,8 +171,16 @@ class ToolDataTableManager(Dictifiable):
         return {name: data_table.to_dict(view="export") for name, data_table in self.data_tables.items()}
 
     def to_json(self, path):
-        with open(path, "w") as out:
-            out.write(json.dumps(self.to_dict()))
+        # Serialize one table at a time rather than building the dict for all tables first
+        with open(path, "wb") as out:
+            out.write(b"{")
+            for i, (name, data_table) in enumerate(self.data_tables.items()):
+                if i:
+                    out.write(b", ")
+                out.write(json_dumps_bytes(name))
+                out.write(b": ")
+                out.write(json_dumps_bytes(data_table.to_dict(view="export")))
+            out.write(b"}")
 
     @classmethod
     def from_dict(cls, d):
@@ -130,6 +188,11 @@ class ToolDataTableManager(Dictifiable):
         tdtm.data_tables = {name: ToolDataTable.from_dict(data) for name, data in d.items()}
         return tdtm
 
+    @classmethod
+    def from_json(cls, path):
+        with open(path, "rb") as fh:
+            return cls.from_dict(json_loads_bytes(fh.read()))
+
     def load_from_config_file(self, config_filename, tool_data_path, from_shed_config=False):
         """
         This method is called under 3 conditions:
@@ -140,35 +203,45 @@ class ToolDataTableManager(Dictifiable):
         3. When a tool shed repository that includes a tool_data_table_conf.xml.sample file is being installed into a local
            Galaxy instance.  In this case, we have 2 entry types to handle, files whose root tag is <tables>, for example:
         """
-        table_elems = []
         if not isinstance(config_filename, list):
             config_filename = [config_filename]
-        for filename in config_filename:
-            tree = util.parse_xml(filename)
-            root = tree.getroot()
-            for table_elem in root.findall("table"):
-                table = ToolDataTable.from_elem(
-                    table_elem,
-                    tool_data_path,
-                    from_shed_config,
-                    filename=filename,
-                    tool_data_path_files=self.tool_data_path_files,
-                    other_config_dict=self.other_config_dict,
+        table_elem_filenames = [
+            (table_elem, filename) for filename in config_filename for table_elem in iter_table_elems(filename)
+        ]
+
+        def load_table(table_elem_filename):
+            table_elem, filename = table_elem_filename
+            return ToolDataTable.from_elem(
+                table_elem,
+                tool_data_path,
+                from_shed_config,
+                filename=filename,
+                tool_data_path_files=self.tool_data_path_files,
+                other_config_dict=self.other_config_dict,
+            )
+
+        # Loading a table is dominated by reading its files, so load tables concurrently and merge them in order below.
+        if len(table_elem_filenames) > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_LOAD_WORKERS, len(table_elem_filenames))) as executor:
+                tables = list(executor.map(load_table, table_elem_filenames))
+        else:
+            tables = [load_table(table_elem_filename) for table_elem_filename in table_elem_filenames]
+        table_elems = []
+        for (table_elem, filename), table in zip(table_elem_filenames, tables):
+            table_elems.append(table_elem)
+            if table.name not in self.data_tables:
+                self.data_tables[table.name] = table
+                log.debug("Loaded tool data table '%s' from file '%s'", table.name, filename)
+            else:
+                log.debug(
+                    "Loading another instance of data table '%s' from file '%s', attempting to merge content.",
+                    table.name,
+                    filename,
                 )
-                table_elems.append(table_elem)
-                if table.name not in self.data_tables:
-                    self.data_tables[table.name] = table
-                    log.debug("Loaded tool data table '%s' from file '%s'", table.name, filename)
-                else:
-                    log.debug(
-                        "Loading another instance of data table '%s' from file '%s', attempting to merge content.",
-                        table.name,
-                        filename,
-                    )
-                    self.data_tables[table.name].merge_tool_data_table(
-                        table, allow_duplicates=False
-                    )  # only merge content, do not persist to disk, do not allow duplicate rows when merging
-                    # FIXME: This does not account for an entry with the same unique build ID, but a different path.
+                self.data_tables[table.name].merge_tool_data_table(
+                    table, allow_duplicates=False
+                )  # only merge content, do not persist to disk, do not allow duplicate rows when merging
+                # FIXME: This does not account for an entry with the same unique build ID, but a different path.
         return table_elems
 
     def add_new_entries_from_config_file(
@@ -240,10 +313,11 @@ class ToolDataTableManager(Dictifiable):
         except Exception as e:
             out_elems = []
             log.debug("Could not parse existing tool data table config, assume no existing elements: %s", e)
-        for elem in remove_elems:
-            # handle multiple occurrences of remove elem in existing elems
-            while elem in out_elems:
-                remove_elems.remove(elem)
+        if remove_elems:
+            # drop every occurrence of the elements to remove from the existing elements, which were parsed
+            # from disk above, so match them by table name and file paths rather than by identity
+            remove_keys = {table_elem_key(elem) for elem in remove_elems}
+            out_elems = [elem for elem in out_elems if table_elem_key(elem) not in remove_keys]
         # add new elems
         out_elems.extend(new_elems)
         out_path_is_new = not os.path.exists(full_path)
@@ -362,14 +436,24 @@ class ToolDataTable:
         self._add_entry(entry, allow_duplicates=allow_duplicates, persist=persist, entry_source=entry_source, **kwd)
         return self._update_version()
 
-    def add_entries(self, entries, allow_duplicates=True, persist=False, entry_source=None, **kwd):
+    def _add_entries(self, entries, allow_duplicates=True, persist=False, entry_source=None, **kwd):
+        """Add each of `entries`, logging those that cannot be added, and return the number added."""
+        added = 0
         for entry in entries:
             try:
-                self.add_entry(
+                self._add_entry(
                     entry, allow_duplicates=allow_duplicates, persist=persist, entry_source=entry_source, **kwd
                 )
+                added += 1
             except Exception as e:
                 log.error(str(e))
+        return added
+
+    def add_entries(self, entries, allow_duplicates=True, persist=False, entry_source=None, **kwd):
+        if self._add_entries(
+            entries, allow_duplicates=allow_duplicates, persist=persist, entry_source=entry_source, **kwd
+        ):
+            self._update_version()
         return self._loaded_content_version
 
     def _remove_entry(self, values):
@@ -435,6 +519,8 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
         )
         self.config_element = config_element
         self.data = []
+        self._row_keys = None
+        self._filename_by_repo_info = None
         self.configure_and_load(config_element, tool_data_path, from_shed_config)
 
     def configure_and_load(self, config_element, tool_data_path, from_shed_config=False, url_timeout=10):
@@ -445,6 +531,9 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
         self.comment_char = config_element.get("comment_char", "#")
         # Configure columns
         self.parse_column_spec(config_element)
+        self._column_name_list = self._build_column_name_list()
+        self._field_names = self._build_field_names()
+        self._columns_ordered = self._build_columns_ordered()
 
         # store repo info if available:
         repo_elem = config_element.find("tool_shed_repository")
@@ -457,6 +546,8 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
             )
         else:
             repo_info = None
+        # Computed once so that the per-file path corrections below are plain string concatenations
+        tool_data_path_prefix = os.path.join(tool_data_path, "")
         # Read every file
         for file_element in config_element.findall("file"):
             tmp_file = None
@@ -465,9 +556,12 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
                 # Handle URLs as files
                 filename = file_element.get("url", None)
                 if filename:
-                    tmp_file = NamedTemporaryFile(prefix=f"TTDT_URL_{self.name}-", mode="w")
+                    tmp_file = NamedTemporaryFile(prefix=f"TTDT_URL_{self.name}-", mode="wb")
                     try:
-                        tmp_file.write(requests.get(filename, timeout=url_timeout).text)
+                        with get_url_session().get(filename, timeout=url_timeout, stream=True) as response:
+                            response.raise_for_status()
+                            for chunk in response.iter_content(chunk_size=URL_CHUNK_SIZE):
+                                tmp_file.write(chunk)
                     except Exception as e:
                         log.error('Error loading Data Table URL "%s": %s', filename, e)
                         continue
@@ -500,8 +594,7 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
                 # regular galaxy app has and uses tool_data_path.
                 # We're loading a tool in the tool shed, so we cannot use the Galaxy tool-data
                 # directory which is hard-coded into the tool_data_table_conf.xml entries.
-                filename = os.path.split(file_path)[1]
-                filename = os.path.join(tool_data_path, filename)
+                filename = tool_data_path_prefix + os.path.basename(file_path)
             if self.tool_data_path_files.exists(filename):
                 found = True
             elif not os.path.isabs(filename):
@@ -511,7 +604,7 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
                 # in self.tool_data_path.
                 file_path, file_name = os.path.split(filename)
                 if file_path != self.tool_data_path:
-                    corrected_filename = os.path.join(self.tool_data_path, file_name)
+                    corrected_filename = tool_data_path_prefix + file_name
                     if self.tool_data_path_files.exists(corrected_filename):
                         filename = corrected_filename
                         found = True
@@ -540,7 +633,6 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
                     filename=filename,
                     from_shed_config=from_shed_config,
                     tool_data_path=tool_data_path,
-                    config_element=config_element,
                     tool_shed_repository=repo_info,
                     errors=errors,
                 )
@@ -584,25 +676,16 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
 
     def get_field(self, value):
         rval = None
-        for i in self.get_named_fields_list():
-            if i["value"] == value:
-                rval = TabularToolDataField(i)
+        rows = self._get_column_index(self.columns["value"]).get(value)
+        if rows:
+            # the last matching row wins
+            rval = TabularToolDataField(dict(zip(self._get_field_names(), rows[-1])))
         return rval
 
     def get_named_fields_list(self):
-        rval = []
-        named_columns = self.get_column_name_list()
-        for fields in self.get_fields():
-            field_dict = {}
-            for i, field in enumerate(fields):
-                if i == len(named_columns):
-                    break
-                field_name = named_columns[i]
-                if field_name is None:
-                    field_name = i  # check that this is supposed to be 0 based.
-                field_dict[field_name] = field
-            rval.append(field_dict)
-        return rval
+        # Fields beyond the named columns are dropped
+        field_names = self._get_field_names()
+        return [dict(zip(field_names, fields)) for fields in self.get_fields()]
 
     def get_version_fields(self):
         return (self._loaded_content_version, self.get_fields())
@@ -621,7 +704,7 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
             column_names = util.xml_text(config_element.find("columns"))
             column_names = [n.strip() for n in column_names.split(",")]
             for index, name in enumerate(column_names):
-                self.columns[name] = index
+                self.columns[sys.intern(name)] = index
                 self.largest_index = index
         else:
             self.largest_index = 0
@@ -631,7 +714,7 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
                 index = column_elem.get("index", None)
                 assert index is not None, "Required 'index' attribute missing from column def"
                 index = int(index)
-                self.columns[name] = index
+                self.columns[sys.intern(name)] = index
                 if index > self.largest_index:
                     self.largest_index = index
                 empty_field_value = column_elem.get("empty_field_value", None)
@@ -643,9 +726,62 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
 
     def extend_data_with(self, filename, errors=None):
         here = os.path.dirname(os.path.abspath(filename))
-        self.data.extend(self.parse_file_fields(filename, errors=errors, here=here))
-        if not self.allow_duplicate_entries:
-            self._deduplicate_data()
+        rows = self.parse_file_fields(filename, errors=errors, here=here)
+        self._intern_repeated_fields(rows)
+        if self.allow_duplicate_entries:
+            self.data.extend(rows)
+            self._row_keys = None
+        else:
+            self._extend_data_without_duplicates(rows)
+
+    def _intern_repeated_fields(self, rows):
+        """
+        Intern the values of columns that repeat a lot (e.g. dbkey or name in per-build tables) so
+        that rows share a single string object per distinct value.  Whether a column repeats enough
+        is decided from the first INTERN_SAMPLE_SIZE rows.
+        """
+        if len(rows) < 2:
+            return
+        sample = rows[:INTERN_SAMPLE_SIZE]
+        for index in range(self.largest_index + 1):
+            if len({fields[index] for fields in sample}) * 2 <= len(sample):
+                for fields in rows:
+                    if isinstance(fields[index], str):
+                        fields[index] = sys.intern(fields[index])
+
+    def _extend_data_without_duplicates(self, rows):
+        # Existing rows are unique here, so only the new rows need to be checked against them and each other
+        row_keys = self._get_row_keys()
+        for fields in rows:
+            row_key = tuple(fields)
+            if row_key in row_keys:
+                log.debug(
+                    'Found duplicate entry in tool data table "%s", but duplicates are not allowed, removing additional entry for: "%s"',
+                    self.name,
+                    fields,
+                )
+            else:
+                row_keys.add(row_key)
+                self.data.append(fields)
+        self._row_keys = row_keys
+
+    def _get_row_keys(self):
+        """
+        Return the set of rows (as tuples) in this table, used to check for duplicate entries.
+
+        Methods adding rows keep the set up to date, every other change to self.data must reset
+        self._row_keys to None so that the set is rebuilt.
+        """
+        row_keys = getattr(self, "_row_keys", None)
+        if row_keys is None:
+            row_keys = self._row_keys = {tuple(fields) for fields in self.data}
+        return row_keys
+
+    def _append_fields(self, fields):
+        self.data.append(fields)
+        row_keys = getattr(self, "_row_keys", None)
+        if row_keys is not None:
+            row_keys.add(tuple(fields))
 
     def parse_file_fields(self, filename, errors=None, here="__HERE__"):
         """
@@ -654,29 +790,42 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
         TODO: Allow named access to fields using the column names.
         """
         separator_char = "<TAB>" if self.separator == "\t" else self.separator
+        separator = self.separator
+        comment_char = self.comment_char
+        largest_index = self.largest_index
         rval = []
         with open(filename) as fh:
-            for i, line in enumerate(fh):
-                if line.lstrip().startswith(self.comment_char):
-                    continue
-                line = line.rstrip("\n\r")
-                if line:
-                    line = expand_here_template(line, here=here)
-                    fields = line.split(self.separator)
-                    if self.largest_index < len(fields):
-                        rval.append(fields)
-                    else:
-                        line_error = (
-                            "Line %i in tool data table '%s' is invalid (HINT: '%s' characters must be used to separate fields):\n%s"
-                            % ((i + 1), self.name, separator_char, line)
-                        )
-                        if errors is not None:
-                            errors.append(line_error)
-                        log.warning(line_error)
+            # Universal newlines mode has already translated line endings to "\n"
+            content = fh.read()
+        # Only lines containing a "$" can be changed by expanding the __HERE__ template
+        if "$" not in content:
+            here = None
+        for i, line in enumerate(content.split("\n")):
+            if not line or line.lstrip().startswith(comment_char):
+                continue
+            if here:
+                line = expand_here_template(line, here=here)
+            fields = line.split(separator)
+            if largest_index < len(fields):
+                rval.append(fields)
+            else:
+                line_error = (
+                    "Line %i in tool data table '%s' is invalid (HINT: '%s' characters must be used to separate fields):\n%s"
+                    % ((i + 1), self.name, separator_char, line)
+                )
+                if errors is not None:
+                    errors.append(line_error)
+                log.warning(line_error)
         log.debug("Loaded %i lines from '%s' for '%s'", len(rval), filename, self.name)
         return rval
 
     def get_column_name_list(self):
+        column_name_list = getattr(self, "_column_name_list", None)
+        if column_name_list is None:
+            column_name_list = self._column_name_list = self._build_column_name_list()
+        return column_name_list
+
+    def _build_column_name_list(self):
         rval = []
         for i in range(self.largest_index + 1):
             found_column = False
@@ -712,21 +861,63 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
             return_col = self.columns.get(return_attr, None)
             if return_col is None:
                 return default
+        else:
+            field_names = self._get_field_names()
         rval = []
         # Look for table entry.
-        for fields in self.get_fields():
-            if fields[query_col] == query_val:
-                if return_attr is None:
-                    field_dict = {}
-                    for i, col_name in enumerate(self.get_column_name_list()):
-                        field_dict[col_name or i] = fields[i]
-                    rval.append(field_dict)
-                else:
-                    rval.append(fields[return_col])
-                if limit is not None and len(rval) == limit:
-                    break
+        for fields in self._get_column_index(query_col).get(query_val, []):
+            if return_attr is None:
+                rval.append(dict(zip(field_names, fields)))
+            else:
+                rval.append(fields[return_col])
+            if limit is not None and len(rval) == limit:
+                break
         return rval or default
 
+    def _get_field_names(self):
+        field_names = getattr(self, "_field_names", None)
+        if field_names is None:
+            field_names = self._field_names = self._build_field_names()
+        return field_names
+
+    def _get_columns_ordered(self):
+        columns_ordered = getattr(self, "_columns_ordered", None)
+        if columns_ordered is None:
+            columns_ordered = self._columns_ordered = self._build_columns_ordered()
+        return columns_ordered
+
+    def _build_columns_ordered(self):
+        # Column names sorted by column index
+        return sorted(self.columns, key=self.columns.get)
+
+    def _build_field_names(self):
+        # Unnamed columns are keyed by their (0 based) index
+        return [i if name is None else name for i, name in enumerate(self.get_column_name_list())]
+
+    def _get_column_index(self, column):
+        """
+        Return a dict mapping each value found in `column` to the rows having it, in table order.
+
+        Indexes are built the first time a column is queried and are all dropped when the table
+        version or the number of rows changes.  Tables are queried from several threads, so an
+        index is only published once it is complete.
+        """
+        index_key = (self._loaded_content_version, len(self.data))
+        column_indexes = getattr(self, "_column_indexes", None)
+        if column_indexes is not None and column_indexes[0] == index_key:
+            rows_by_value = column_indexes[1].get(column)
+            if rows_by_value is not None:
+                return rows_by_value
+            indexes = dict(column_indexes[1])
+        else:
+            indexes = {}
+        rows_by_value = {}
+        for fields in self.get_fields():
+            rows_by_value.setdefault(fields[column], []).append(fields)
+        indexes[column] = rows_by_value
+        self._column_indexes = (index_key, indexes)
+        return rows_by_value
+
     def get_filename_for_source(self, source, default=None):
         if source:
             # if dict, assume is compatible info dict, otherwise call method
@@ -736,18 +927,45 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
                 source_repo_info = source.get_tool_shed_repository_info_dict()
         else:
             source_repo_info = None
-        filename = default
-        for name, value in self.filenames.items():
-            repo_info = value.get("tool_shed_repository", None)
-            if (not source_repo_info and not repo_info) or (
-                source_repo_info and repo_info and source_repo_info == repo_info
-            ):
-                filename = name
-                break
-        return filename
+        return self._get_filename_by_repo_info().get(repo_info_key(source_repo_info), default)
+
+    def _get_filename_by_repo_info(self):
+        """
+        Return a dict mapping the repo_info_key of each file's tool shed repository info to the first
+        file having it.
+
+        Files are only ever added to a table, so the dict is rebuilt when their number changes.
+        """
+        filename_by_repo_info = getattr(self, "_filename_by_repo_info", None)
+        if filename_by_repo_info is None or filename_by_repo_info[0] != len(self.filenames):
+            by_repo_info = {}
+            for name, value in self.filenames.items():
+                by_repo_info.setdefault(repo_info_key(value.get("tool_shed_repository", None)), name)
+            filename_by_repo_info = self._filename_by_repo_info = (len(self.filenames), by_repo_info)
+        return filename_by_repo_info[1]
 
     def _add_entry(self, entry, allow_duplicates=True, persist=False, entry_source=None, **kwd):
-        # accepts dict or list of columns
+        fields = self._add_fields(entry, allow_duplicates=allow_duplicates)
+        if persist:
+            self._persist_fields([fields], entry_source)
+
+    def _add_entries(self, entries, allow_duplicates=True, persist=False, entry_source=None, **kwd):
+        # Add all entries in memory first, then append them to the .loc file with a single write
+        added_fields = []
+        for entry in entries:
+            try:
+                added_fields.append(self._add_fields(entry, allow_duplicates=allow_duplicates))
+            except Exception as e:
+                log.error(str(e))
+        if persist and added_fields:
+            try:
+                self._persist_fields(added_fields, entry_source)
+            except Exception as e:
+                log.error(str(e))
+        return len(added_fields)
+
+    def _add_fields(self, entry, allow_duplicates=True):
+        """Add `entry` (a dict or list of columns) to the in-memory data and return the fields added."""
         if isinstance(entry, dict):
             fields = []
             for column_name in self.get_column_name_list():
@@ -766,8 +984,8 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
             fields = entry
         if self.largest_index < len(fields):
             fields = self._replace_field_separators(fields)
-            if (allow_duplicates and self.allow_duplicate_entries) or fields not in self.get_fields():
-                self.data.append(fields)
+            if (allow_duplicates and self.allow_duplicate_entries) or tuple(fields) not in self._get_row_keys():
+                self._append_fields(fields)
             else:
                 raise MessageException(
                     f"Attempted to add fields ({fields}) to data table '{self.name}', but this entry already exists and allow_duplicates is False."
@@ -776,68 +994,81 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
             raise MessageException(
                 f"Attempted to add fields ({fields}) to data table '{self.name}', but there were not enough fields specified ( {len(fields)} < {self.largest_index + 1} )."
             )
-        filename = None
+        return fields
 
-        if persist:
-            filename = self.get_filename_for_source(entry_source)
-            if filename is None:
-                # If we reach this point, there is no data table with a corresponding .loc file.
-                raise MessageException(
-                    f"Unable to determine filename for persisting data table '{self.name}' values: '{self.fields}'."
-                )
-            else:
-                log.debug("Persisting changes to file: %s", filename)
-                with FileLock(filename):
-                    try:
-                        if os.path.exists(filename):
-                            data_table_fh = open(filename, "r+b")
-                            if os.stat(filename).st_size > 0:
-                                # ensure last existing line ends with new line
-                                data_table_fh.seek(-1, 2)  # last char in file
-                                last_char = data_table_fh.read(1)
-                                if last_char not in [b"\n", b"\r"]:
-                                    data_table_fh.write(b"\n")
-                        else:
-                            data_table_fh = open(filename, "wb")
-                    except OSError as e:
-                        log.exception("Error opening data table file (%s): %s", filename, e)
-                        raise
-                fields = f"{self.separator.join(fields)}\n"
-                data_table_fh.write(fields.encode("utf-8"))
+    def _persist_fields(self, fields_list, entry_source=None):
+        """Append the rows in `fields_list` to the .loc file for `entry_source`."""
+        filename = self.get_filename_for_source(entry_source)
+        if filename is None:
+            # If we reach this point, there is no data table with a corresponding .loc file.
+            raise MessageException(
+                f"Unable to determine filename for persisting data table '{self.name}' values: '{fields_list}'."
+            )
+        log.debug("Persisting changes to file: %s", filename)
+        lines = "".join(f"{self.separator.join(fields)}\n" for fields in fields_list)
+        with FileLock(filename):
+            try:
+                # creates the file if needed, the position starts at its end
+                data_table_fh = open(filename, "a+b")
+            except OSError as e:
+                log.exception("Error opening data table file (%s): %s", filename, e)
+                raise
+            with data_table_fh:
+                if data_table_fh.tell() > 0:
+                    # ensure last existing line ends with new line
+                    data_table_fh.seek(-1, os.SEEK_END)  # last char in file
+                    if data_table_fh.read(1) not in [b"\n", b"\r"]:
+                        lines = f"\n{lines}"
+                data_table_fh.write(lines.encode("utf-8"))
 
     def _remove_entry(self, values):
-
+        values = self._replace_field_separators(values)
         # update every file
         for filename in self.filenames:
 
             if os.path.exists(filename):
-                values = self._replace_field_separators(values)
-                self.filter_file_fields(filename, values)
+                try:
+                    self.filter_file_fields(filename, values)
+                except Exception:
+                    # The files that were already filtered no longer match the data, so load them again
+                    self.reload_from_files()
+                    raise
             else:
                 log.warning(f"Cannot find index file '{filename}' for tool data table '{self.name}'")
 
-        self.reload_from_files()
+        self.data[:] = [fields for fields in self.data if fields != values]
+        # the removed row must no longer count as an existing entry
+        self._row_keys = None
 
     def filter_file_fields(self, loc_file, values):
         """
         Reads separated lines from file and print back only the lines that pass a filter.
+
+        The filtered lines are streamed to a temporary file that then replaces `loc_file`, which is
+        not rewritten if no line matches. Returns the number of lines removed.
         """
+        # `values` cannot contain the separator, so comparing the joined line is equivalent to comparing fields
+        values_line = self.separator.join(values)
         with open(loc_file) as reader:
-            rval = ""
+            # Leave files without a matching line untouched
+            if not any(
+                line.rstrip("\n\r") == values_line and not line.lstrip().startswith(self.comment_char)
+                for line in reader
+            ):
+                return 0
+        removed = 0
+        with open(loc_file) as reader, RenamedTemporaryFile(loc_file, mode="w") as writer:
+            shutil.copymode(loc_file, writer.name)
             for line in reader:
                 if line.lstrip().startswith(self.comment_char):
-                    rval += line
+                    writer.write(line)
                 else:
                     line_s = line.rstrip("\n\r")
-                    if line_s:
-                        fields = line_s.split(self.separator)
-                        if fields != values:
-                            rval += line
-
-        with open(loc_file, "w") as writer:
-            writer.write(rval)
-
-        return rval
+                    if line_s == values_line:
+                        removed += 1
+                    elif line_s:
+                        writer.write(line)
+        return removed
 
     def _replace_field_separators(self, fields, separator=None, replace=None, comment_char=None):
         # make sure none of the fields contain separator
@@ -860,21 +1091,21 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
 
     def _deduplicate_data(self):
         # Remove duplicate entries, without recreating self.data object
-        dup_lines = []
-        hash_set = set()
-        for i, fields in enumerate(self.data):
-            fields_hash = hash(self.separator.join(fields))
-            if fields_hash in hash_set:
-                dup_lines.append(i)
+        row_keys = set()
+        deduplicated_data = []
+        for fields in self.data:
+            row_key = tuple(fields)
+            if row_key in row_keys:
                 log.debug(
                     'Found duplicate entry in tool data table "%s", but duplicates are not allowed, removing additional entry for: "%s"',
                     self.name,
                     fields,
                 )
             else:
-                hash_set.add(fields_hash)
-        for i in reversed(dup_lines):
-            self.data.pop(i)
+                row_keys.add(row_key)
+                deduplicated_data.append(fields)
+        self.data[:] = deduplicated_data
+        self._row_keys = row_keys
 
     @property
     def xml_string(self):
@@ -883,7 +1114,7 @@ class TabularToolDataTable(ToolDataTable, Dictifiable):
     def to_dict(self, view="collection"):
         rval = super().to_dict(view=view)
         if view == "element":
-            rval["columns"] = sorted(self.columns.keys(), key=lambda x: self.columns[x])
+            rval["columns"] = list(self._get_columns_ordered())
             rval["fields"] = self.get_fields()
         return rval
 
@@ -894,12 +1125,16 @@ class TabularToolDataField(Dictifiable):
 
     def __init__(self, data):
         self.data = data
+        self._base_path = None
+        self._base_dir = None
 
     def __getitem__(self, key):
         return self.data[key]
 
     def get_base_path(self):
-        return os.path.normpath(os.path.abspath(self.data["path"]))
+        if self._base_path is None:
+            self._base_path = os.path.normpath(os.path.abspath(self.data["path"]))
+        return self._base_path
 
     def get_base_dir(self):
         path = self.get_base_path()
@@ -908,27 +1143,43 @@ class TabularToolDataField(Dictifiable):
         return path
 
     def clean_base_dir(self, path):
-        return re.sub(f"^{self.get_base_dir()}/*", "", path)
+        if self._base_dir is None:
+            self._base_dir = self.get_base_dir()
+        if path.startswith(self._base_dir):
+            return path[len(self._base_dir) :].lstrip("/")
+        return re.sub(f"^{self._base_dir}/*", "", path)
 
     def get_files(self):
-        return glob(f"{self.get_base_path()}*")
+        return [entry.path for entry in self._scan_files()]
+
+    def _scan_files(self):
+        """
+        Return the directory entries of the files whose path starts with the base path, as
+        ``glob(f"{self.get_base_path()}*")`` would find them.
+        """
+        dirname, prefix = os.path.split(self.get_base_path())
+        try:
+            with os.scandir(dirname) as it:
+                entries = [entry for entry in it if entry.name.startswith(prefix)]
+        except OSError:
+            return []
+        return entries
 
     def get_filesize_map(self, rm_base_dir=False):
         out = {}
-        for path in self.get_files():
+        for entry in self._scan_files():
             if rm_base_dir:
-                out[self.clean_base_dir(path)] = os.path.getsize(path)
+                out[self.clean_base_dir(entry.path)] = entry.stat().st_size
             else:
-                out[path] = os.path.getsize(path)
+                out[entry.path] = entry.stat().st_size
         return out
 
-    def get_fingerprint(self):
-        sha1 = hashlib.sha1()
-        fmap = self.get_filesize_map(True)
-        for k in sorted(fmap.keys()):
-            sha1.update(util.smart_str(k))
-            sha1.update(util.smart_str(fmap[k]))
-        return sha1.hexdigest()
+    def get_fingerprint(self, fmap=None):
+        if fmap is None:
+            fmap = self.get_filesize_map(True)
+        # Hashing the concatenated names and sizes in one call gives the same digest as updating with each of them
+        fingerprint_input = b"".join(util.smart_str(k) + util.smart_str(fmap[k]) for k in sorted(fmap.keys()))
+        return hashlib.sha1(fingerprint_input).hexdigest()
 
     def to_dict(self):
         rval = super().to_dict()
@@ -936,7 +1187,7 @@ class TabularToolDataField(Dictifiable):
         rval["fields"] = self.data
         rval["base_dir"] = (self.get_base_dir(),)
         rval["files"] = self.get_filesize_map(True)
-        rval["fingerprint"] = self.get_fingerprint()
+        rval["fingerprint"] = self.get_fingerprint(fmap=rval["files"])
         return rval
 
 
@@ -980,6 +1231,8 @@ class RefgenieToolDataTable(TabularToolDataTable):
         )
         self.config_element = config_element
         self.data = []
+        self._row_keys = None
+        self._filename_by_repo_info = None
         self.configure_and_load(config_element, tool_data_path, from_shed_config)
 
     def configure_and_load(self, config_element, tool_data_path, from_shed_config=False, url_timeout=10):
@@ -1022,6 +1275,17 @@ class RefgenieToolDataTable(TabularToolDataTable):
             if errors is not None:
                 errors.append(e)
             return []
+        # (index, value, is template, strip) for each column, computed once for all entries
+        column_plan = [
+            (
+                index,
+                self.key_map[name],
+                self.template_for_column.get(name, False),
+                self.strip_for_column.get(name, False),
+            )
+            for name, index in self.columns.items()
+        ]
+        row_length = self.largest_index + 1
         rval = []
         for genome in rgc.list_genomes_by_asset(self.rg_asset):
             genome_attributes = rgc.get_genome_attributes(genome)
@@ -1052,13 +1316,12 @@ class RefgenieToolDataTable(TabularToolDataTable):
                     "__REFGENIE__": rgc,
                     "__REFGENIE_SEEK_KEY__": _seek_key,
                 }
-                fields = [""] * (self.largest_index + 1)
-                for name, index in self.columns.items():
-                    rg_value = self.key_map[name]
+                fields = [""] * row_length
+                for index, rg_value, is_template, strip in column_plan:
                     # Default is hard-coded value
-                    if self.template_for_column.get(name, False):
+                    if is_template:
                         rg_value = fill_template(rg_value, template_dict)
-                    if self.strip_for_column.get(name, False):
+                    if strip:
                         rg_value = rg_value.strip()
                     fields[index] = rg_value
                 rval.append(fields)
@@ -1078,8 +1341,65 @@ class RefgenieToolDataTable(TabularToolDataTable):
         super()._remove_entry(values)
 
 
+def json_dumps_bytes(obj):
+    """Serialize `obj` to UTF-8 encoded JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def json_loads_bytes(content):
+    """Deserialize UTF-8 encoded JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def iter_table_elems(filename):
+    """
+    Yield each <table> element of a data table config file, whose root tag may be <tables> or <table>,
+    as soon as it has been parsed.  Only the root element or its direct children are yielded, comments
+    are dropped and whitespace is stripped as in util.parse_xml.
+    """
+    iterparse_kwds = {"remove_comments": True} if util.LXML_AVAILABLE else {}
+    root_tag = None
+    depth = 0
+    try:
+        for event, elem in util.etree.iterparse(filename, events=("start", "end"), **iterparse_kwds):
+            if event == "start":
+                if root_tag is None:
+                    root_tag = elem.tag
+                depth += 1
+                continue
+            # number of ancestors of elem, 0 for the root element
+            depth -= 1
+            if elem.tag == "table" and (depth == 0 or (depth == 1 and root_tag != "table")):
+                for sub_elem in elem.iter("*"):
+                    if sub_elem.text is not None:
+                        sub_elem.text = sub_elem.text.strip()
+                    if sub_elem.tail is not None:
+                        sub_elem.tail = sub_elem.tail.strip()
+                yield elem
+    except util.etree.ParseError:
+        log.exception("Error parsing file %s", filename)
+        raise
+
+
+def table_elem_key(elem):
+    """Return a key identifying a data table config element by its table name and the paths of its files."""
+    return (elem.get("name"), tuple(file_elem.get("path") for file_elem in elem.findall("file")))
+
+
+def repo_info_key(repo_info):
+    """Return a hashable key for a flat tool shed repository info dict, None when there is no info."""
+    if not repo_info:
+        return None
+    return frozenset(repo_info.items())
+
+
 def expand_here_template(content, here=None):
-    if here and content:
+    # Template substitution (including "$$" unescaping) can only change content containing a "$"
+    if here and content and "$" in content:
         content = string.Template(content).safe_substitute({"__HERE__": here})
     return content
 
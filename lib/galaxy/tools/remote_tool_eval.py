@@ -1,4 +1,3 @@
-import json
 import os
 import shutil
 import tempfile
@@ -87,8 +86,7 @@ def main(TMPDIR, WORKING_DIRECTORY, IMPORT_STORE_DIRECTORY):
         root=TMPDIR,
         is_admin_user=lambda _: job_io.user_context.is_admin,
     )
-    with open(os.path.join(IMPORT_STORE_DIRECTORY, "tool_data_tables.json")) as data_tables_json:
-        tdtm = ToolDataTableManager.from_dict(json.load(data_tables_json))
+    tdtm = ToolDataTableManager.from_json(os.path.join(IMPORT_STORE_DIRECTORY, "tool_data_tables.json"))
     app = ToolApp(
         sa_session=import_store.sa_session,
         tool_app_config=tool_app_config,
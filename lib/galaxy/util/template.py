@@ -1,6 +1,7 @@
 """Entry point for the usage of Cheetah templating within Galaxy."""
 
 import traceback
+from functools import lru_cache
 from lib2to3.refactor import RefactoringTool
 
 import packaging.version
@@ -27,6 +28,11 @@ class FixedModuleCodeCompiler(Compiler):
         return self._moduleDef
 
 
+@lru_cache(maxsize=None)
+def parse_python_template_version(python_template_version):
+    return packaging.version.parse(python_template_version)
+
+
 def create_compiler_class(module_code):
     class CustomCompilerClass(FixedModuleCodeCompiler):
         pass
@@ -56,7 +62,7 @@ def fill_template(
     if not context:
         context = kwargs
     if isinstance(python_template_version, str):
-        python_template_version = packaging.version.parse(python_template_version)
+        python_template_version = parse_python_template_version(python_template_version)
     try:
         klass = Template.compile(source=template_text, compilerClass=compiler_class)
     except ParseError as e:
@@ -1,4 +1,8 @@
+from functools import lru_cache
+from typing import Tuple
+
 from fastapi import (
+    APIRouter,
     FastAPI,
     Request,
 )
@@ -37,8 +41,17 @@ def add_request_id_middleware(app: FastAPI):
     app.add_middleware(RawContextMiddleware, plugins=(RequestIdPlugin(force_new_uuid=True),))
 
 
-def include_all_package_routers(app: FastAPI, package_name: str):
+@lru_cache(maxsize=None)
+def package_routers(package_name: str) -> Tuple[APIRouter, ...]:
+    """Return the routers of all controller modules in `package_name`, walking the package only once."""
+    routers = []
     for _, module in walk_controller_modules(package_name):
         router = getattr(module, "router", None)
         if router:
-            app.include_router(router)
+            routers.append(router)
+    return tuple(routers)
+
+
+def include_all_package_routers(app: FastAPI, package_name: str):
+    for router in package_routers(package_name):
+        app.include_router(router)
@@ -260,6 +260,10 @@ class Router(InferringRouter):
         """Extend FastAPI.delete to accept a require_admin Galaxy flag."""
         return super().delete(*args, **self._handle_galaxy_kwd(kwd))
 
+    def head(self, *args, **kwd):
+        """Extend FastAPI.head to accept a require_admin Galaxy flag."""
+        return super().head(*args, **self._handle_galaxy_kwd(kwd))
+
     def _handle_galaxy_kwd(self, kwd):
         require_admin = kwd.pop("require_admin", False)
         if require_admin:
@@ -1,16 +1,20 @@
 """
 API for updating Galaxy Pages
 """
-import io
+import gzip
+import hashlib
 import logging
 
 from fastapi import (
     Body,
     Path,
     Query,
+    Request,
     Response,
     status,
 )
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
 from starlette.responses import StreamingResponse
 
 from galaxy.managers.context import ProvidesUserContext
@@ -25,6 +29,7 @@ from galaxy.schema.schema import (
     ShareWithStatus,
     SharingStatus,
 )
+from galaxy.util import CHUNK_SIZE
 from galaxy.web import (
     expose_api,
     expose_api_anonymous_and_sessionless,
@@ -38,8 +43,19 @@ from . import (
     Router,
 )
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 log = logging.getLogger(__name__)
 
+# JSON bodies smaller than this are sent uncompressed, compressing them costs more than it saves
+GZIP_MINIMUM_SIZE = 1024
+GZIP_COMPRESS_LEVEL = 5
+# PDFs up to this size are sent as a single response body rather than streamed in chunks
+PDF_STREAMING_THRESHOLD = 1024 * 1024
+
 router = Router(tags=["pages"])
 
 DeletedQueryParam: bool = Query(
@@ -51,6 +67,75 @@ PageIdPathParam: EncodedDatabaseIdField = Path(
 )
 
 
+async def iter_chunks(content: bytes):
+    """Yield `content` in CHUNK_SIZE slices, so the response is sent in chunks without another in-memory copy."""
+    for start in range(0, len(content), CHUNK_SIZE):
+        yield content[start : start + CHUNK_SIZE]
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the If-None-Match header of `request` matches `etag`, using weak comparison."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque_tag(tag: str) -> str:
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque_tag(etag) in {opaque_tag(tag.strip()) for tag in if_none_match.split(",")}
+
+
+def accepts_gzip(request: Request) -> bool:
+    """Whether the Accept-Encoding header of `request` allows a gzip encoded response.
+
+    Codings are weighed by their q-values, so ``gzip;q=0`` refuses gzip and ``*`` covers unlisted codings.
+    """
+    qualities = {}
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    return qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0))) > 0
+
+
+def conditional_json_response(request: Request, model: BaseModel) -> Response:
+    """Serialize `model` with a strong ETag, answering 304 Not Modified when the client already has it.
+
+    Large bodies are gzip encoded for clients that accept it.
+    """
+    if orjson is not None:
+        # single pass in C for large listings, pydantic's encoder only handles types orjson doesn't know
+        data = model.dict(by_alias=True)
+        if model.__custom_root_type__:
+            data = data["__root__"]
+        content = orjson.dumps(data, default=pydantic_encoder)
+    else:
+        content = model.json(by_alias=True).encode("utf-8")
+    digest = hashlib.sha1(content).hexdigest()
+    headers = {}
+    compress = False
+    if len(content) >= GZIP_MINIMUM_SIZE:
+        headers["Vary"] = "Accept-Encoding"
+        compress = accepts_gzip(request)
+    # the gzip encoded body is a different representation and gets its own strong ETag
+    headers["ETag"] = f'"{digest}-gzip"' if compress else f'"{digest}"'
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if compress:
+        content = gzip.compress(content, compresslevel=GZIP_COMPRESS_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
 @router.cbv
 class FastAPIPages:
     service: PagesService = depends(PagesService)
@@ -59,14 +144,16 @@ class FastAPIPages:
         "/api/pages",
         summary="Lists all Pages viewable by the user.",
         response_description="A list with summary page information.",
+        response_model=PageSummaryList,
     )
-    async def index(
+    def index(
         self,
+        request: Request,
         trans: ProvidesUserContext = DependsOnTrans,
         deleted: bool = DeletedQueryParam,
-    ) -> PageSummaryList:
+    ) -> Response:
         """Get a list with summary information of all Pages available to the user."""
-        return self.service.index(trans, deleted)
+        return conditional_json_response(request, self.service.index(trans, deleted))
 
     @router.post(
         "/api/pages",
@@ -86,7 +173,7 @@ class FastAPIPages:
         summary="Marks the specific Page as deleted.",
         status_code=status.HTTP_204_NO_CONTENT,
     )
-    async def delete(
+    def delete(
         self,
         trans: ProvidesUserContext = DependsOnTrans,
         id: EncodedDatabaseIdField = PageIdPathParam,
@@ -107,8 +194,9 @@ class FastAPIPages:
             501: {"description": "PDF conversion service not available."},
         },
     )
-    async def show_pdf(
+    def show_pdf(
         self,
+        request: Request,
         trans: ProvidesUserContext = DependsOnTrans,
         id: EncodedDatabaseIdField = PageIdPathParam,
     ):
@@ -116,21 +204,62 @@ class FastAPIPages:
 
         This feature may not be available in this Galaxy.
         """
-        pdf_bytes = self.service.show_pdf(trans, id)
-        return StreamingResponse(io.BytesIO(pdf_bytes), media_type="application/pdf")
+        page = self.service.get_pdf_page(trans, id)
+        etag = self.service.pdf_etag(trans, page)
+        if etag_matches(request, etag):
+            # The client already has the PDF of this revision, skip rendering it
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        pdf_bytes = self.service.render_pdf(trans, page)
+        if len(pdf_bytes) <= PDF_STREAMING_THRESHOLD:
+            return Response(content=pdf_bytes, media_type="application/pdf", headers={"ETag": etag})
+        headers = {"ETag": etag, "Content-Length": str(len(pdf_bytes))}
+        return StreamingResponse(iter_chunks(pdf_bytes), media_type="application/pdf", headers=headers)
+
+    @router.head(
+        "/api/pages/{id}.pdf",
+        summary="Return the headers of the PDF document of the last revision of the Page.",
+        response_class=Response,
+        responses={
+            200: {"description": "The PDF document can be downloaded."},
+            501: {"description": "PDF conversion service not available."},
+        },
+    )
+    def show_pdf_head(
+        self,
+        request: Request,
+        trans: ProvidesUserContext = DependsOnTrans,
+        id: EncodedDatabaseIdField = PageIdPathParam,
+    ):
+        """Check that a PDF document of the last revision of the Page can be downloaded, without rendering it.
+
+        The size of the document is only reported if it has already been rendered.
+        """
+        page = self.service.get_pdf_page(trans, id)
+        etag = self.service.pdf_etag(trans, page)
+        size = self.service.cached_pdf_size(trans, page)
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response = Response(media_type="application/pdf", headers={"ETag": etag})
+        if size is None:
+            del response.headers["Content-Length"]
+        else:
+            response.headers["Content-Length"] = str(size)
+        return response
 
     @router.get(
         "/api/pages/{id}",
         summary="Return a page summary and the content of the last revision.",
         response_description="The page summary information.",
+        response_model=PageDetails,
     )
-    async def show(
+    def show(
         self,
+        request: Request,
         trans: ProvidesUserContext = DependsOnTrans,
         id: EncodedDatabaseIdField = PageIdPathParam,
-    ) -> PageDetails:
+    ) -> Response:
         """Return summary information about a specific Page and the content of the last revision."""
-        return self.service.show(trans, id)
+        return conditional_json_response(request, self.service.show(trans, id))
 
     @router.get(
         "/api/pages/{id}/sharing",
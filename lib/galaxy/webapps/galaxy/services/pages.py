@@ -1,11 +1,31 @@
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Optional,
+    Tuple,
+)
+
+from sqlalchemy.orm import (
+    joinedload,
+    lazyload,
+    selectinload,
+)
 
 from galaxy import (
     exceptions,
     model,
 )
 from galaxy.managers import base
-from galaxy.managers.markdown_util import internal_galaxy_markdown_to_pdf
+from galaxy.managers.markdown_util import (
+    internal_galaxy_markdown_to_pdf,
+    weasyprint_available,
+)
 from galaxy.managers.pages import (
     PageManager,
     PageSerializer,
@@ -25,6 +45,77 @@ from galaxy.webapps.galaxy.services.sharable import ShareableService
 
 log = logging.getLogger(__name__)
 
+# Upper bound for the total size of the rendered PDFs kept in memory by each process.
+PDF_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class PdfCache:
+    """A thread-safe, size bounded LRU cache of rendered PDF documents.
+
+    Concurrent requests for a document that is not cached yet wait for a single render.
+    """
+
+    def __init__(self, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._inflight: Dict[Hashable, "Future[bytes]"] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key: Hashable) -> Optional[bytes]:
+        pdf_bytes = self._entries.get(key)
+        if pdf_bytes is not None:
+            self._entries.move_to_end(key)
+        return pdf_bytes
+
+    def set(self, key: Hashable, pdf_bytes: bytes) -> None:
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = pdf_bytes
+            self._size += len(pdf_bytes)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        """Return the cached document for ``key``, calling ``render`` at most once across concurrent callers."""
+        with self._lock:
+            pdf_bytes = self._get(key)
+            if pdf_bytes is not None:
+                return pdf_bytes
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = Future()
+                rendering = True
+            else:
+                rendering = False
+        if not rendering:
+            return future.result()
+        try:
+            pdf_bytes = render()
+            self.set(key, pdf_bytes)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(pdf_bytes)
+            return pdf_bytes
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+
+# PagesService is instantiated per request, keep the rendered PDFs at module level
+PAGE_PDF_CACHE = PdfCache()
+
 
 class PagesService(ServiceBase):
     """Common interface/service logic for interactions with pages in the context of the API.
@@ -53,9 +144,17 @@ class PagesService(ServiceBase):
         :returns:   dictionaries containing summary or detailed Page information
         """
         out = []
+        # Page.to_dict needs the owner's username and all revision ids of each page, load them
+        # with the pages rather than with two extra queries per page. The summaries include no
+        # revision content, so don't join the latest revision and load only the revision ids.
+        query = trans.sa_session.query(model.Page).options(
+            joinedload(model.Page.user),
+            lazyload(model.Page.latest_revision),
+            selectinload(model.Page.revisions).load_only(model.PageRevision.id),
+        )
 
         if trans.user_is_admin:
-            r = trans.sa_session.query(model.Page)
+            r = query
             if not deleted:
                 r = r.filter_by(deleted=False)
             for row in r:
@@ -63,13 +162,13 @@ class PagesService(ServiceBase):
         else:
             # Transaction user's pages (if any)
             user = trans.user
-            r = trans.sa_session.query(model.Page).filter_by(user=user)
+            r = query.filter_by(user=user)
             if not deleted:
                 r = r.filter_by(deleted=False)
             for row in r:
                 out.append(trans.security.encode_all_ids(row.to_dict(), recursive=True))
             # Published pages from other users
-            r = trans.sa_session.query(model.Page).filter(model.Page.user != user).filter_by(published=True)
+            r = query.filter(model.Page.user != user).filter_by(published=True)
             if not deleted:
                 r = r.filter_by(deleted=False)
             for row in r:
@@ -121,8 +220,45 @@ class PagesService(ServiceBase):
         :rtype: dict
         :returns: Dictionary return of the Page.to_dict call with the 'content' field populated by the most recent revision
         """
+        return self.render_pdf(trans, self.get_pdf_page(trans, id))
+
+    def get_pdf_page(self, trans, id: EncodedDatabaseIdField) -> model.Page:
+        """
+        Return the page with the given id if it is accessible and its latest revision can be exported as PDF.
+        """
         page = base.get_object(trans, id, "Page", check_ownership=False, check_accessible=True)
         if page.latest_revision.content_format != PageContentFormat.markdown.value:
             raise exceptions.RequestParameterInvalidException("PDF export only allowed for Markdown based pages")
-        internal_galaxy_markdown = page.latest_revision.content
-        return internal_galaxy_markdown_to_pdf(trans, internal_galaxy_markdown, PdfDocumentType.page)
+        if not weasyprint_available():
+            raise exceptions.ServerNotConfiguredForRequest("PDF conversion service not available.")
+        return page
+
+    def render_pdf(self, trans, page: model.Page) -> bytes:
+        """
+        Return the PDF of the latest revision of `page` as rendered for the requesting user.
+        """
+        revision = page.latest_revision
+        return PAGE_PDF_CACHE.get_or_render(
+            self._pdf_cache_key(trans, page),
+            lambda: internal_galaxy_markdown_to_pdf(trans, revision.content, PdfDocumentType.page),
+        )
+
+    def cached_pdf_size(self, trans, page: model.Page) -> Optional[int]:
+        """
+        Return the size in bytes of the PDF of `page` if it has already been rendered for the requesting user.
+        """
+        pdf_bytes = PAGE_PDF_CACHE.get(self._pdf_cache_key(trans, page))
+        return len(pdf_bytes) if pdf_bytes is not None else None
+
+    def pdf_etag(self, trans, page: model.Page) -> str:
+        """
+        Return a weak entity tag for the PDF of the latest revision of `page` as rendered for the
+        requesting user, which changes whenever a new revision is saved.
+        """
+        cache_key = ":".join(str(part) for part in self._pdf_cache_key(trans, page))
+        return f'W/"{hashlib.sha1(cache_key.encode("utf-8")).hexdigest()}"'
+
+    def _pdf_cache_key(self, trans, page: model.Page) -> Tuple:
+        revision = page.latest_revision
+        # embedded objects are rendered only if accessible to the requesting user, so the user is part of the key
+        return (page.id, revision.id, revision.update_time.isoformat(), trans.user and trans.user.id)
@@ -6,7 +6,11 @@ from typing import (
     Tuple,
 )
 
-from sqlalchemy import false
+from sqlalchemy import (
+    false,
+    or_,
+)
+from sqlalchemy.orm import joinedload
 
 from galaxy import exceptions
 from galaxy.managers import base
@@ -107,10 +111,14 @@ class ShareableService:
         return item
 
     def _get_sharing_status(self, trans, item):
-        status = self.serializer.serialize_to_view(item, user=trans.user, trans=trans, default_view="sharing")
+        # users_shared_with is replaced below, don't let the serializer query the shares a second time
+        keys = [key for key in self.serializer.views["sharing"] if key != "users_shared_with"]
+        status = self.serializer.serialize_to_view(item, user=trans.user, trans=trans, keys=keys)
+        # load the shares together with their users instead of one user query per share
+        user_share_model = self.manager.user_share_model
+        share_assocs = self.manager.query_associated(user_share_model, item).options(joinedload(user_share_model.user))
         status["users_shared_with"] = [
-            {"id": self.manager.app.security.encode_id(a.user.id), "email": a.user.email}
-            for a in item.users_shared_with
+            {"id": self.manager.app.security.encode_id(a.user.id), "email": a.user.email} for a in share_assocs
         ]
         return SharingStatus.parse_obj(status)
 
@@ -119,26 +127,36 @@ class ShareableService:
             raise exceptions.MessageException("Missing required user IDs or emails")
         send_to_users: Set[User] = set()
         send_to_err: Set[str] = set()
+        emails: Set[str] = set()
+        ids_by_email_or_id = {}
         for email_or_id in set(emails_or_ids):
             email_or_id = email_or_id.strip()
             if not email_or_id:
                 continue
-
-            send_to_user = None
             if "@" in email_or_id:
-                email_address = email_or_id
-                send_to_user = self.manager.user_manager.by_email(
-                    email_address, filters=[User.table.c.deleted == false()]
-                )
+                emails.add(email_or_id)
             else:
                 try:
-                    decoded_user_id = trans.security.decode_id(email_or_id)
-                    send_to_user = self.manager.user_manager.by_id(decoded_user_id)
-                    if send_to_user.deleted:
-                        send_to_user = None
+                    ids_by_email_or_id[email_or_id] = trans.security.decode_id(email_or_id)
                 except exceptions.MalformedId:
-                    send_to_user = None
-
+                    send_to_err.add(f"{email_or_id} is not a valid Galaxy user.")
+
+        # resolve all emails and ids with a single query instead of one per user
+        found_users = []
+        if emails or ids_by_email_or_id:
+            user_table = User.table.c
+            found_users = self.manager.user_manager.list(
+                filters=[
+                    user_table.deleted == false(),
+                    or_(user_table.email.in_(emails), user_table.id.in_(ids_by_email_or_id.values())),
+                ],
+                order_by=user_table.id,
+            )
+        users_by_email = {user.email: user for user in found_users}
+        users_by_id = {user.id: user for user in found_users}
+        resolved = [(email, users_by_email.get(email)) for email in emails]
+        resolved.extend((email_or_id, users_by_id.get(user_id)) for email_or_id, user_id in ids_by_email_or_id.items())
+        for email_or_id, send_to_user in resolved:
             if not send_to_user:
                 send_to_err.add(f"{email_or_id} is not a valid Galaxy user.")
             elif send_to_user == trans.user:
@@ -136,6 +136,20 @@ class SharingApiTests(UsesApiTestCaseMixin):
         assert sharing_response["errors"]
         assert invalid_user_email in sharing_response["errors"][0]
 
+    def test_sharing_with_valid_and_invalid_users(self):
+        user_id = self._setup_user("mixed01@user.com")["id"]
+        self._setup_user("mixed02@user.com")
+        invalid_user_emails = ["unknown01@user.com", "unknown02@user.com"]
+
+        resource_id = self.create("resource-to-share-mixed-users")
+
+        payload = {"user_ids": [user_id, "mixed02@user.com"] + invalid_user_emails}
+        sharing_response = self._set_resource_sharing(resource_id, action="share_with_users", payload=payload)
+        # every unknown user is reported and none of the valid ones
+        assert len(sharing_response["errors"]) == len(invalid_user_emails)
+        for email in invalid_user_emails:
+            assert any(email in error for error in sharing_response["errors"])
+
     def test_set_slug(self):
         resource_id = self.create("resource-to-set-slug")
         other_resource_id = self.create("other-resource-to-set-slug")
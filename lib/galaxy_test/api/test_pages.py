@@ -1,6 +1,9 @@
 from unittest import SkipTest
 
-from requests import delete
+from requests import (
+    delete,
+    head,
+)
 
 from galaxy.exceptions import error_codes
 from galaxy_test.api.sharable import SharingApiTests
@@ -211,6 +214,43 @@ steps:
         self.assertEqual(show_json["content"], "<p>Page!</p>")
         self.assertEqual(show_json["content_format"], "html")
 
+    def test_show_not_modified(self):
+        response_json = self._create_valid_page_with_slug("pagetoshowconditionally")
+        show_response = self._get(f"pages/{response_json['id']}")
+        self._assert_status_code_is(show_response, 200)
+        etag = show_response.headers["ETag"]
+        not_modified_response = self._get(f"pages/{response_json['id']}", headers={"If-None-Match": etag})
+        self._assert_status_code_is(not_modified_response, 304)
+        assert not_modified_response.content == b""
+        index_response = self._get("pages")
+        self._assert_status_code_is(index_response, 200)
+        index_etag = index_response.headers["ETag"]
+        self._assert_status_code_is(self._get("pages", headers={"If-None-Match": index_etag}), 304)
+        self._create_valid_page_with_slug("pagechangingindex")
+        self._assert_status_code_is(self._get("pages", headers={"If-None-Match": index_etag}), 200)
+
+    def test_show_gzip_encoded(self):
+        content = "<p>Page!</p>" * 200
+        page_request = self._test_page_payload(slug="large-page-to-compress", content=content)
+        page_response = self._post("pages", page_request, json=True)
+        self._assert_status_code_is(page_response, 200)
+        page_id = page_response.json()["id"]
+        gzip_response = self._get(f"pages/{page_id}", headers={"Accept-Encoding": "gzip"})
+        self._assert_status_code_is(gzip_response, 200)
+        assert gzip_response.headers["Content-Encoding"] == "gzip"
+        assert gzip_response.json()["content"] == content
+        identity_response = self._get(f"pages/{page_id}", headers={"Accept-Encoding": "identity"})
+        self._assert_status_code_is(identity_response, 200)
+        assert "Content-Encoding" not in identity_response.headers
+        assert identity_response.headers["ETag"] != gzip_response.headers["ETag"]
+        refused_response = self._get(f"pages/{page_id}", headers={"Accept-Encoding": "gzip;q=0, identity"})
+        self._assert_status_code_is(refused_response, 200)
+        assert "Content-Encoding" not in refused_response.headers
+        assert refused_response.headers["ETag"] == identity_response.headers["ETag"]
+        assert refused_response.headers["Vary"] == "Accept-Encoding"
+        wildcard_response = self._get(f"pages/{page_id}", headers={"Accept-Encoding": "*;q=0.5"})
+        assert wildcard_response.headers["Content-Encoding"] == "gzip"
+
     def test_403_on_unowner_show(self):
         response_json = self._create_valid_page_as("others_page_show@bx.psu.edu", "otherspageshow")
         show_response = self._get(f"pages/{response_json['id']}")
@@ -231,6 +271,8 @@ steps:
         api_asserts.assert_error_code_is(
             pdf_response, error_codes.error_codes_by_name["SERVER_NOT_CONFIGURED_FOR_REQUEST"]
         )
+        head_response = head(self._api_url(f"pages/{page_id}.pdf", use_key=True))
+        api_asserts.assert_status_code_is(head_response, 501)
 
     def test_pdf_when_service_available(self):
         configuration = self.dataset_populator.get_configuration()
@@ -245,6 +287,11 @@ steps:
         api_asserts.assert_status_code_is(pdf_response, 200)
         assert "application/pdf" in pdf_response.headers["content-type"]
         assert pdf_response.content[0:4] == b"%PDF"
+        # the rendered document is cached, HEAD reports its size without rendering it again
+        head_response = head(self._api_url(f"pages/{page_id}.pdf", use_key=True))
+        api_asserts.assert_status_code_is(head_response, 200)
+        assert head_response.headers["etag"] == pdf_response.headers["etag"]
+        assert int(head_response.headers["content-length"]) == len(pdf_response.content)
 
     def test_400_on_download_pdf_when_unsupported_content_format(self):
         page_request = self._test_page_payload(slug="html-page-to-pdf", content_format="html")
@@ -253,6 +300,8 @@ steps:
         page_id = page_response.json()["id"]
         pdf_response = self._get(f"pages/{page_id}.pdf")
         self._assert_status_code_is(pdf_response, 400)
+        head_response = head(self._api_url(f"pages/{page_id}.pdf", use_key=True))
+        self._assert_status_code_is(head_response, 400)
 
     def _users_index_has_page_with_id(self, id):
         index_response = self._get("pages")
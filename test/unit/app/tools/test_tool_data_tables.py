@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from galaxy.exceptions import MessageException
+from galaxy.tools.data import (
+    get_url_session,
+    iter_table_elems,
+    TabularToolDataTable,
+    ToolDataPathFiles,
+    ToolDataTableManager,
+)
+from galaxy.util import (
+    etree,
+    parse_xml,
+    XML,
+)
+
+
+def _table(tmp_path, loc_contents, allow_duplicate_entries=True):
+    loc_path = os.path.join(tmp_path, "test.loc")
+    with open(loc_path, "w") as fh:
+        fh.write(loc_contents)
+    config_element = XML(
+        f"""<table name="test" comment_char="#" allow_duplicate_entries="{allow_duplicate_entries}">
+            <columns>value, dbkey, name, path</columns>
+            <file path="{loc_path}" />
+        </table>"""
+    )
+    return TabularToolDataTable(config_element, str(tmp_path), tool_data_path_files=ToolDataPathFiles(str(tmp_path)))
+
+
+def test_parse_file_fields(tmp_path):
+    table = _table(tmp_path, "#value\tdbkey\tname\tpath\nhg19\thg19\tHuman\t${__HERE__}/hg19.fa\r\n\ninvalid\n")
+    assert table.get_fields() == [["hg19", "hg19", "Human", f"{tmp_path}/hg19.fa"]]
+    errors = table.filenames[os.path.join(tmp_path, "test.loc")]["errors"]
+    assert len(errors) == 1
+    assert errors[0].startswith("Line 4 in tool data table 'test' is invalid")
+
+
+def test_get_entries(tmp_path):
+    table = _table(
+        tmp_path, "hg19\thg19\tHuman\t/hg19.fa\nmm10\tmm10\tMouse\t/mm10.fa\nhg19b\thg19\tHuman b\t/hg19b.fa\n"
+    )
+    assert table.get_entry("value", "mm10", "path") == "/mm10.fa"
+    assert table.get_entry("value", "missing", "path") is None
+    assert table.get_entries("dbkey", "hg19", "value") == ["hg19", "hg19b"]
+    assert table.get_entry("value", "hg19b", None) == {
+        "value": "hg19b",
+        "dbkey": "hg19",
+        "name": "Human b",
+        "path": "/hg19b.fa",
+    }
+    table.add_entry(["rn6", "rn6", "Rat", "/rn6.fa"])
+    assert table.get_entry("value", "rn6", "name") == "Rat"
+    assert table.get_entries("dbkey", "rn6", "name") == ["Rat"]
+    assert table.get_field("mm10")["path"] == "/mm10.fa"
+    assert table.get_field("missing") is None
+
+
+def test_get_entries_concurrently(tmp_path):
+    rows = "".join(f"v{i}\tdb{i % 10}\tname {i}\t/path{i}.fa\n" for i in range(2000))
+
+    def query(table, barrier, thread_index):
+        barrier.wait()
+        missing = []
+        for i in range(thread_index, 2000, 97):
+            if table.get_entry("value", f"v{i}", "path") != f"/path{i}.fa":
+                missing.append(i)
+            if not table.get_entries("dbkey", f"db{i % 10}", "value"):
+                missing.append(i)
+        return missing
+
+    # switch threads often so that lookups interleave with the index being built
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(5):
+            table = _table(tmp_path, rows)
+            barrier = threading.Barrier(8)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda thread_index: query(table, barrier, thread_index), range(8)))
+            assert results == [[]] * 8
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+
+def test_url_session_per_thread():
+    session = get_url_session()
+    assert get_url_session() is session
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(get_url_session).result() is not session
+
+
+def test_duplicate_entries_not_loaded(tmp_path):
+    loc_contents = "hg19\thg19\tHuman\t/hg19.fa\nmm10\tmm10\tMouse\t/mm10.fa\nhg19\thg19\tHuman\t/hg19.fa\n"
+    table = _table(tmp_path, loc_contents, allow_duplicate_entries=False)
+    assert [fields[0] for fields in table.get_fields()] == ["hg19", "mm10"]
+    table.handle_found_index_file(os.path.join(tmp_path, "test.loc"))
+    assert [fields[0] for fields in table.get_fields()] == ["hg19", "mm10"]
+    version = table._loaded_content_version
+    assert table.add_entries([["mm10", "mm10", "Mouse", "/mm10.fa"]], allow_duplicates=False) == version
+    assert table.add_entries([["rn6", "rn6", "Rat", "/rn6.fa"]], allow_duplicates=False) == version + 1
+    assert table.add_entries([["rn6", "rn6", "Rat", "/rn6.fa"]], allow_duplicates=False) == version + 1
+    assert len(_table(tmp_path, loc_contents).get_fields()) == 3
+
+
+def test_merge_deduplicates(tmp_path):
+    loc_contents = "hg19\thg19\tHuman\t/hg19.fa\nmm10\tmm10\tMouse\t/mm10.fa\nhg19\thg19\tHuman\t/hg19.fa\n"
+    table = _table(tmp_path, loc_contents)
+    other_path = tmp_path / "other"
+    other_path.mkdir()
+    other_table = _table(
+        other_path, "rn6\trn6\tRat\t/rn6.fa\nmm10\tmm10\tMouse\t/mm10.fa\n", allow_duplicate_entries=False
+    )
+    table.merge_tool_data_table(other_table, allow_duplicates=False)
+    assert [fields[0] for fields in table.get_fields()] == ["hg19", "mm10", "rn6"]
+
+
+def test_add_entries_persist(tmp_path):
+    table = _table(tmp_path, "hg19\thg19\tHuman\t/hg19.fa")
+    version = table._loaded_content_version
+    new_version = table.add_entries(
+        [
+            ["mm10", "mm10", "Mouse", "/mm10.fa"],
+            ["too", "few"],
+            {"value": "rn6", "dbkey": "rn6", "name": "Rat", "path": "/rn6.fa"},
+        ],
+        persist=True,
+    )
+    assert new_version == version + 1
+    assert [fields[0] for fields in table.get_fields()] == ["hg19", "mm10", "rn6"]
+    with open(os.path.join(tmp_path, "test.loc")) as fh:
+        assert fh.read() == "hg19\thg19\tHuman\t/hg19.fa\nmm10\tmm10\tMouse\t/mm10.fa\nrn6\trn6\tRat\t/rn6.fa\n"
+    assert table.add_entries([["too", "few"]]) == new_version
+
+
+def test_manager_to_json(tmp_path):
+    manager = ToolDataTableManager(str(tmp_path))
+    manager["test"] = _table(tmp_path, "hg19\thg19\tHuman\t/hg19.fa\n")
+    json_path = os.path.join(tmp_path, "tool_data_tables.json")
+    manager.to_json(json_path)
+    with open(json_path) as fh:
+        assert json.load(fh) == manager.to_dict()
+    restored = ToolDataTableManager.from_json(json_path)
+    assert restored["test"].get_entry("value", "hg19", "path") == "/hg19.fa"
+
+
+def test_load_from_config_file_table_root(tmp_path):
+    with open(os.path.join(tmp_path, "test.loc"), "w") as fh:
+        fh.write("hg19\thg19\tHuman\t/hg19.fa\n")
+    config_path = os.path.join(tmp_path, "tool_data_table_conf.xml")
+    with open(config_path, "w") as fh:
+        fh.write(
+            f"""<!-- a single table -->
+            <table name="test" comment_char="#">
+                <columns> value, dbkey, name, path </columns>
+                <file path="{tmp_path}/test.loc" />
+            </table>"""
+        )
+    manager = ToolDataTableManager(str(tmp_path), config_filename=config_path)
+    assert manager["test"].get_entry("value", "hg19", "path") == "/hg19.fa"
+
+
+def test_iter_table_elems_top_level_only(tmp_path):
+    config_path = os.path.join(tmp_path, "tool_data_table_conf.xml")
+    with open(config_path, "w") as fh:
+        fh.write(
+            """<tables>
+                <table name="a"><columns>value</columns></table>
+                <group><table name="nested" /></group>
+                <table name="b"><columns>value</columns></table>
+            </tables>"""
+        )
+    assert [elem.get("name") for elem in iter_table_elems(config_path)] == ["a", "b"]
+    with open(config_path, "w") as fh:
+        fh.write('<table name="root"><table name="nested" /></table>')
+    assert [elem.get("name") for elem in iter_table_elems(config_path)] == ["root"]
+
+
+def test_iter_table_elems_logs_parse_errors(tmp_path, caplog):
+    config_path = os.path.join(tmp_path, "tool_data_table_conf.xml")
+    with open(config_path, "w") as fh:
+        fh.write('<tables><table name="a"></tables>')
+    with pytest.raises(etree.ParseError):
+        list(iter_table_elems(config_path))
+    assert f"Error parsing file {config_path}" in caplog.text
+
+
+def test_to_xml_file_removes_elems(tmp_path):
+    config_path = os.path.join(tmp_path, "shed_tool_data_table_conf.xml")
+    with open(config_path, "w") as fh:
+        fh.write(
+            """<tables>
+                <table name="a"><columns>value</columns><file path="a.loc" /></table>
+                <table name="b"><columns>value</columns><file path="b.loc" /></table>
+                <table name="b"><columns>value</columns><file path="other_b.loc" /></table>
+            </tables>"""
+        )
+    manager = ToolDataTableManager(str(tmp_path))
+    remove_elem = XML('<table name="b"><columns>value</columns><file path="b.loc" /></table>')
+    new_elem = XML('<table name="c"><columns>value</columns><file path="c.loc" /></table>')
+    manager.to_xml_file(config_path, new_elems=[new_elem], remove_elems=[remove_elem])
+    written = [(elem.get("name"), elem.find("file").get("path")) for elem in parse_xml(config_path).getroot()]
+    assert written == [("a", "a.loc"), ("b", "other_b.loc"), ("c", "c.loc")]
+
+
+def test_remove_entry(tmp_path):
+    table = _table(tmp_path, "#value\tdbkey\tname\tpath\nhg19\thg19\tHuman\t/hg19.fa\n\nmm10\tmm10\tMouse\t/mm10.fa\n")
+    loc_path = os.path.join(tmp_path, "test.loc")
+    os.chmod(loc_path, 0o644)
+    table.remove_entry(["hg19", "hg19", "Human", "/hg19.fa"])
+    assert [fields[0] for fields in table.get_fields()] == ["mm10"]
+    with open(loc_path) as fh:
+        assert fh.read() == "#value\tdbkey\tname\tpath\nmm10\tmm10\tMouse\t/mm10.fa\n"
+    assert os.stat(loc_path).st_mode & 0o777 == 0o644
+
+
+def test_remove_entry_then_add(tmp_path):
+    table = _table(tmp_path, "a\ta\tA\t/a.fa\nb\tb\tB\t/b.fa\n")
+    table.add_entry(["c", "c", "C", "/c.fa"], allow_duplicates=False)
+    table.remove_entry(["a", "a", "A", "/a.fa"])
+    # an append without duplicate check brings the number of rows back to what it was before the removal
+    table.add_entry(["x", "x", "X", "/x.fa"])
+    table.add_entry(["a", "a", "A", "/a.fa"], allow_duplicates=False)
+    with pytest.raises(MessageException):
+        table.add_entry(["x", "x", "X", "/x.fa"], allow_duplicates=False)
+    assert [fields[0] for fields in table.get_fields()] == ["b", "c", "x", "a"]
+
+
+def test_reload_with_same_row_count(tmp_path):
+    table = _table(tmp_path, "a\ta\tA\t/a.fa\n")
+    table.add_entry(["b", "b", "B", "/b.fa"], allow_duplicates=False)
+    with open(os.path.join(tmp_path, "test.loc"), "w") as fh:
+        fh.write("c\tc\tC\t/c.fa\nd\td\tD\t/d.fa\n")
+    table.reload_from_files()
+    table.add_entry(["a", "a", "A", "/a.fa"], allow_duplicates=False)
+    with pytest.raises(MessageException):
+        table.add_entry(["c", "c", "C", "/c.fa"], allow_duplicates=False)
+    assert [fields[0] for fields in table.get_fields()] == ["c", "d", "a"]
+
+
+def test_get_filename_for_source(tmp_path):
+    table = _table(tmp_path, "hg19\thg19\tHuman\t/hg19.fa\n")
+    loc_path = os.path.join(tmp_path, "test.loc")
+    repo_info = dict(tool_shed="toolshed.g2.bx.psu.edu", name="repo", owner="devteam", installed_changeset_revision="1")
+    table.filenames["shed.loc"] = dict(tool_shed_repository=repo_info)
+    assert table.get_filename_for_source(None) == loc_path
+    assert table.get_filename_for_source(dict(repo_info)) == "shed.loc"
+    assert table.get_filename_for_source(dict(repo_info, name="other"), default="default.loc") == "default.loc"
+
+
+def test_persist_to_new_file(tmp_path):
+    table = _table(tmp_path, "hg19\thg19\tHuman\t/hg19.fa\n")
+    os.remove(os.path.join(tmp_path, "test.loc"))
+    table.add_entry(["mm10", "mm10", "Mouse", "/mm10.fa"], persist=True)
+    with open(os.path.join(tmp_path, "test.loc")) as fh:
+        assert fh.read() == "mm10\tmm10\tMouse\t/mm10.fa\n"
+
+
+def test_field_fingerprint(tmp_path):
+    for name, contents in (("hg19.fa", "ACGT"), ("hg19.fa.fai", "hg19\t4")):
+        with open(os.path.join(tmp_path, name), "w") as fh:
+            fh.write(contents)
+    table = _table(tmp_path, f"hg19\thg19\tHuman\t{tmp_path}/hg19.fa\n")
+    field = table.get_field("hg19").to_dict()
+    assert field["files"] == {"hg19.fa": 4, "hg19.fa.fai": 6}
+    assert field["fingerprint"] == hashlib.sha1(b"hg19.fa4hg19.fa.fai6").hexdigest()
+
+
+def test_filter_file_fields_without_match(tmp_path):
+    loc_contents = "hg19\thg19\tHuman\t/hg19.fa\n\n"
+    table = _table(tmp_path, loc_contents)
+    loc_path = os.path.join(tmp_path, "test.loc")
+    inode = os.stat(loc_path).st_ino
+    assert table.filter_file_fields(loc_path, ["mm10", "mm10", "Mouse", "/mm10.fa"]) == 0
+    assert os.stat(loc_path).st_ino == inode
+    with open(loc_path) as fh:
+        assert fh.read() == loc_contents
+
+
+def test_to_dict_element(tmp_path):
+    table = _table(tmp_path, "hg19\thg19\tHuman\t/hg19.fa\n")
+    assert table.to_dict(view="element")["columns"] == ["value", "dbkey", "name", "path"]
+    restored = ToolDataTableManager.from_dict({"test": table.to_dict(view="export")})["test"]
+    assert restored.to_dict(view="element")["columns"] == ["value", "dbkey", "name", "path"]
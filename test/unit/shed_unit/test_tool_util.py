@@ -0,0 +1,142 @@
+import gzip
+import os
+
+from galaxy.tool_shed.util.tool_util import (
+    build_tool_panel_section_select_field,
+    copy_sample_file,
+    generate_message_for_invalid_tools,
+    get_tool_path_install_dir,
+    is_data_index_sample_file,
+)
+from galaxy.util import XML
+
+
+def _write(tmp_path, name, content):
+    path = os.path.join(tmp_path, name)
+    with open(path, "wb") as fh:
+        fh.write(content)
+    return path
+
+
+def test_is_data_index_sample_file_tabular(tmp_path):
+    path = _write(tmp_path, "all_fasta.loc.sample", b"#value\tdbkey\tname\tpath\nhg19\thg19\tHuman\t/data/hg19.fa\n")
+    assert is_data_index_sample_file(path)
+
+
+def test_is_data_index_sample_file_plain_text(tmp_path):
+    path = _write(tmp_path, "README.sample", b"Some notes about this repository.\n")
+    assert is_data_index_sample_file(path)
+
+
+def test_is_data_index_sample_file_rejects_binary(tmp_path):
+    assert not is_data_index_sample_file(_write(tmp_path, "a.gz.sample", gzip.compress(b"a\tb\n")))
+    assert not is_data_index_sample_file(_write(tmp_path, "a.bz2.sample", b"BZh91AY&SY"))
+    assert not is_data_index_sample_file(_write(tmp_path, "a.zip.sample", b"PK\x03\x04\x14\x00"))
+    assert not is_data_index_sample_file(_write(tmp_path, "a.png.sample", b"\x89PNG\r\n\x1a\n\x00\x00"))
+    assert not is_data_index_sample_file(_write(tmp_path, "a.bin.sample", b"abc\x00def"))
+
+
+def test_is_data_index_sample_file_rejects_binary_with_text_header(tmp_path):
+    path = _write(tmp_path, "a.dat.sample", b"header text\n" * 200 + b"\x00\x01\x02" * 1000)
+    assert not is_data_index_sample_file(path)
+
+
+def test_is_data_index_sample_file_rejects_html(tmp_path):
+    path = _write(tmp_path, "page.sample", b'<html><body><a href="http://example.org">link</a></body></html>\n')
+    assert not is_data_index_sample_file(path)
+
+
+def test_is_data_index_sample_file_rechecks_modified_file(tmp_path):
+    path = _write(tmp_path, "changing.sample", b"a\tb\nc\td\n")
+    assert is_data_index_sample_file(path)
+    _write(tmp_path, "changing.sample", b"abc\x00def\x00ghi")
+    assert not is_data_index_sample_file(path)
+
+
+class _Toolbox:
+    def __init__(self, sections):
+        self._reload_count = 0
+        self.sections = sections
+        self.calls = 0
+
+    def get_sections(self):
+        self.calls += 1
+        return iter(self.sections)
+
+
+class _App:
+    def __init__(self, toolbox):
+        self.toolbox = toolbox
+
+
+def test_build_tool_panel_section_select_field_reuses_options_until_reload():
+    toolbox = _Toolbox([("sec_a", "Section A")])
+    app = _App(toolbox)
+    assert build_tool_panel_section_select_field(app).options == [("Section A", "sec_a", False)]
+    toolbox.sections = [("sec_b", "Section B")]
+    assert build_tool_panel_section_select_field(app).options == [("Section A", "sec_a", False)]
+    assert toolbox.calls == 1
+    toolbox._reload_count += 1
+    assert build_tool_panel_section_select_field(app).options == [("Section B", "sec_b", False)]
+    assert toolbox.calls == 2
+
+
+def test_get_tool_path_install_dir():
+    config_elems = [
+        XML('<tool guid="top/tool/1.0" />'),
+        XML('<section id="s"><tool guid="nested/tool/1.0" /></section>'),
+    ]
+    shed_tool_conf_dict = {"tool_path": "shed_tools"}
+    assert get_tool_path_install_dir("repo", shed_tool_conf_dict, {"guid": "top/tool/1.0"}, config_elems) == (
+        "shed_tools",
+        os.path.join("shed_tools", "repo"),
+    )
+    assert get_tool_path_install_dir("repo", shed_tool_conf_dict, {"guid": "nested/tool/1.0"}, config_elems)[0]
+    assert get_tool_path_install_dir("repo", shed_tool_conf_dict, {"guid": "new/tool/1.0"}, config_elems) == (
+        None,
+        None,
+    )
+    config_elems[1].append(XML('<tool guid="new/tool/1.0" />'))
+    assert get_tool_path_install_dir("repo", shed_tool_conf_dict, {"guid": "new/tool/1.0"}, config_elems)[0]
+
+
+class _Repository:
+    changeset_revision = "abc123"
+
+
+def test_generate_message_for_invalid_tools_missing_file():
+    app = _App(None)
+    app.name = "galaxy"
+    invalid_file_tups = [
+        ("tool.xml", "[Errno 2] No such file or directory: '/srv/galaxy/tool-data/all_fasta.loc'"),
+        ("other.xml", "Invalid <b>tag</b><br/>here"),
+    ]
+    message = generate_message_for_invalid_tools(
+        app, invalid_file_tups, _Repository(), {}, as_html=False, displaying_invalid_tool=True
+    )
+    assert "refers to a missing file all_fasta.loc." in message
+    assert "named all_fasta.loc.sample to the repository" in message
+    assert "other.xml - Invalid tag\nhere\n" in message
+
+
+def test_copy_sample_file_keeps_existing_loc(tmp_path):
+    repo_dir = tmp_path / "repo"
+    tool_data = tmp_path / "tool-data"
+    repo_dir.mkdir()
+    tool_data.mkdir()
+    sample = _write(repo_dir, "all_fasta.loc.sample", b"#sample\n")
+    loc_path = copy_sample_file(None, sample, dest_path=str(tool_data))
+    assert loc_path == os.path.join(tool_data, "all_fasta.loc")
+    assert (tool_data / "all_fasta.loc.sample").read_bytes() == b"#sample\n"
+    assert (tool_data / "all_fasta.loc").read_bytes() == b"#sample\n"
+    (tool_data / "all_fasta.loc").write_bytes(b"hg19\thg19\n")
+    _write(repo_dir, "all_fasta.loc.sample", b"#updated sample\n")
+    copy_sample_file(None, sample, dest_path=str(tool_data))
+    assert (tool_data / "all_fasta.loc.sample").read_bytes() == b"#updated sample\n"
+    assert (tool_data / "all_fasta.loc").read_bytes() == b"hg19\thg19\n"
+
+
+def test_is_data_index_sample_file_by_extension(tmp_path):
+    # Unambiguous extensions are resolved without opening the file.
+    assert is_data_index_sample_file(os.path.join(tmp_path, "missing.loc.sample"))
+    assert not is_data_index_sample_file(os.path.join(tmp_path, "missing.PNG.sample"))
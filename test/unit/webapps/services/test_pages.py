@@ -0,0 +1,75 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from galaxy.webapps.galaxy.services.pages import (
+    PagesService,
+    PdfCache,
+)
+
+
+def test_pdf_cache_evicts_least_recently_used():
+    cache = PdfCache(max_bytes=10)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.set("c", b"cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+
+
+def test_pdf_cache_skips_oversized_documents():
+    cache = PdfCache(max_bytes=4)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbbb")
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("b") is None
+
+
+def test_pdf_cache_coalesces_concurrent_renders():
+    cache = PdfCache()
+    started = threading.Event()
+    release = threading.Event()
+    renders = []
+
+    def render():
+        renders.append(1)
+        started.set()
+        release.wait(5)
+        return b"%PDF"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(cache.get_or_render, "a", render)
+        assert started.wait(5)
+        waiters = [executor.submit(cache.get_or_render, "a", render) for _ in range(3)]
+        release.set()
+        assert first.result() == b"%PDF"
+        assert [waiter.result() for waiter in waiters] == [b"%PDF"] * 3
+    assert len(renders) == 1
+
+
+def test_pdf_cache_does_not_cache_failed_renders():
+    cache = PdfCache()
+
+    def fail():
+        raise ValueError("render failed")
+
+    with pytest.raises(ValueError):
+        cache.get_or_render("a", fail)
+    assert cache.get_or_render("a", lambda: b"%PDF") == b"%PDF"
+
+
+def test_pdf_etag_depends_on_user(monkeypatch):
+    monkeypatch.setattr(PagesService, "__init__", lambda _: None)
+    service = PagesService()  # type: ignore
+    revision = SimpleNamespace(id=2, update_time=datetime(2022, 1, 1))
+    page = SimpleNamespace(id=1, latest_revision=revision)
+    owner_etag = service.pdf_etag(SimpleNamespace(user=SimpleNamespace(id=1)), page)
+    assert owner_etag.startswith('W/"')
+    assert owner_etag == service.pdf_etag(SimpleNamespace(user=SimpleNamespace(id=1)), page)
+    assert owner_etag != service.pdf_etag(SimpleNamespace(user=SimpleNamespace(id=3)), page)
+    assert owner_etag != service.pdf_etag(SimpleNamespace(user=None), page)